@@ -1,3 +1,4 @@
+from ai.ollama.client import ChatResult, OllamaClient
 from ai.ollama.text import Text as OllamaText
 from ai.ollama.vision import Vision as OllamaVision
 from ai.open_ai.vision import Vision as OpenAiVision
@@ -0,0 +1,45 @@
+import re
+from typing import Optional, Sequence
+
+# Replies that are the model declining or explaining itself, not an album name
+_REFUSAL = re.compile(
+    r"\b(?:sorry|as an ai|language model|i can(?:'|no)t|i am unable|i'm unable|unable to|not able to)\b",
+    re.IGNORECASE,
+)
+# Longer than any album title worth matching; a sentence of prose usually is
+MAX_ALBUM_NAME_LENGTH = 120
+
+
+def parse_side(value: str) -> Optional[int]:
+    """A side as written on a label or by a model ("2", "B", "side b") as a 1-based number."""
+    value = (value or "").strip().strip(".").upper()
+    if value.startswith("SIDE"):
+        value = value[4:].strip(" :.")
+    if value.isdigit():
+        return int(value) or None
+    if len(value) == 1 and "A" <= value <= "Z":
+        return ord(value) - ord("A") + 1
+    return None
+
+
+def is_album_name(value: str) -> bool:
+    """Whether a reply's first line can be an album name rather than a refusal or prose."""
+    value = (value or "").strip()
+    return 0 < len(value) <= MAX_ALBUM_NAME_LENGTH and _REFUSAL.search(value) is None
+
+
+def parse_answer(lines: Sequence[str]) -> Optional[tuple]:
+    """
+    (album name, side) from a model's "Album Name\\nside" reply, or None if
+    malformed: more than two lines, a first line that is a refusal or prose,
+    or a second line that isn't a side. The side is None when it is missing.
+    """
+    lines = [line.strip() for line in lines if line.strip()]
+    if len(lines) < 1 or len(lines) > 2 or not is_album_name(lines[0]):
+        return None
+    if len(lines) == 1:
+        return lines[0], None
+    side = parse_side(lines[1])
+    if side is None:
+        return None
+    return lines[0], side
@@ -0,0 +1,192 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, List, Optional, Union
+import numpy as np
+from PIL import Image
+from ai.answer import parse_answer
+
+
+def perceptual_hash(image: Union[bytes, Image.Image]) -> int:
+    """
+    64-bit difference hash: compares neighbouring pixels of a 9x8 grayscale
+    thumbnail, so re-encodes, small crops or lighting changes of the same
+    photo land within a few bits of each other.
+    """
+    if isinstance(image, bytes):
+        image = Image.open(io.BytesIO(image))
+    small = np.asarray(image.convert("L").resize((9, 8), Image.Resampling.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def _is_valid_answer(answer) -> bool:
+    return parse_answer(answer) is not None
+
+
+class AnswerCache:
+    """
+    A persistent cache of model answers, keyed by a SHA-256 of the model name,
+    the prompt and the exact image bytes or text sent.
+
+    With `max_distance` > 0, images that miss on their exact key are also
+    matched by perceptual hash: any cached answer for the same model and
+    prompt whose hash is within `max_distance` bits counts as a hit, so a
+    second photo of the same label is free too. Entries beyond `max_entries`
+    are evicted least recently used first, and entries older than `ttl`
+    seconds are ignored and dropped. Answers are stored as JSON.
+
+    memoize() only stores answers that pass `validate`, by default
+    ai.answer.parse_answer, so a refusal or malformed reply is asked again
+    next time instead of being served forever.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10000, max_distance: int = 0,
+                 ttl: Optional[float] = 30 * 24 * 60 * 60, validate: Callable[[List[str]], bool] = None):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.validate = validate if validate is not None else _is_valid_answer
+        self.rejected = 0
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key TEXT PRIMARY KEY, scope TEXT NOT NULL, phash INTEGER, "
+            "answer TEXT NOT NULL, accessed REAL NOT NULL, created REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(answers)")}
+        if "created" not in columns:
+            # Caches from before expiry: their entries count as expired
+            self._db.execute("ALTER TABLE answers ADD COLUMN created REAL")
+        self._db.execute("CREATE INDEX IF NOT EXISTS answers_scope ON answers (scope)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed)")
+        self._db.commit()
+
+    @staticmethod
+    def _scope(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf8")).hexdigest()
+
+    @staticmethod
+    def _key(scope: str, content: Union[bytes, str]) -> str:
+        if isinstance(content, str):
+            content = content.encode("utf8")
+        return hashlib.sha256(scope.encode("ascii") + content).hexdigest()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    def get(self, model: str, prompt: str, content: Union[bytes, str], phash: Optional[int] = None):
+        scope = self._scope(model, prompt)
+        key = self._key(scope, content)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT answer FROM answers WHERE key = ? AND created >= ?", (key, self._cutoff())
+            ).fetchone()
+            if row is not None:
+                self.hits += 1
+                self._touch(key)
+                return json.loads(row[0])
+            if phash is not None and self.max_distance > 0:
+                near = self._nearest(scope, phash)
+                if near is not None:
+                    self.near_hits += 1
+                    self._touch(near[0])
+                    return json.loads(near[1])
+            self.misses += 1
+            return None
+
+    def _nearest(self, scope, phash):
+        rows = self._db.execute(
+            "SELECT key, answer, phash FROM answers WHERE scope = ? AND phash IS NOT NULL AND created >= ?",
+            (scope, self._cutoff())
+        ).fetchall()
+        if not rows:
+            return None
+        hashes = np.array([row[2] for row in rows], dtype=np.int64).view(np.uint64)
+        differing = np.bitwise_xor(hashes, np.uint64(phash & (2 ** 64 - 1)))
+        distances = np.unpackbits(differing.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        best = int(np.argmin(distances))
+        if distances[best] > self.max_distance:
+            return None
+        return rows[best]
+
+    def _touch(self, key):
+        self._db.execute("UPDATE answers SET accessed = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+
+    def put(self, model: str, prompt: str, content: Union[bytes, str], answer, phash: Optional[int] = None):
+        scope = self._scope(model, prompt)
+        key = self._key(scope, content)
+        if phash is not None:
+            # SQLite integers are signed 64-bit
+            phash = int(np.uint64(phash).view(np.int64))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO answers (key, scope, phash, answer, accessed, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, scope, phash, json.dumps(answer), now, now)
+            )
+            self._db.execute("DELETE FROM answers WHERE created IS NULL OR created < ?", (self._cutoff(),))
+            count = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY accessed LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._db.commit()
+
+    def memoize(self, model: str, prompt: str, content: Union[bytes, str], compute: Callable[[], List[str]],
+                image: Union[bytes, Image.Image, None] = None) -> List[str]:
+        """Returns the cached answer, or calls compute() and caches what it returns if it is valid."""
+        phash = perceptual_hash(image) if image is not None and self.max_distance > 0 else None
+        answer = self.get(model, prompt, content, phash)
+        if answer is None:
+            answer = compute()
+            self._put_valid(model, prompt, content, answer, phash)
+        return answer
+
+    async def memoize_async(self, model: str, prompt: str, content: Union[bytes, str],
+                            compute: Callable[[], Awaitable[List[str]]],
+                            image: Union[bytes, Image.Image, None] = None) -> List[str]:
+        """Like memoize(), for a coroutine function."""
+        phash = perceptual_hash(image) if image is not None and self.max_distance > 0 else None
+        answer = self.get(model, prompt, content, phash)
+        if answer is None:
+            answer = await compute()
+            self._put_valid(model, prompt, content, answer, phash)
+        return answer
+
+    def _put_valid(self, model, prompt, content, answer, phash):
+        if self.validate(answer):
+            self.put(model, prompt, content, answer, phash)
+        else:
+            with self._lock:
+                self.rejected += 1
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
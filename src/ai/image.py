@@ -0,0 +1,28 @@
+import io
+from typing import Union
+from PIL import Image
+
+# A label image as accepted by the vision backends: a file path, already
+# encoded bytes, or a PIL image straight out of preprocessing
+ImageInput = Union[str, bytes, Image.Image]
+
+
+def encode_image(image: ImageInput, max_side: int = 1024, quality: int = 85) -> bytes:
+    """
+    Encodes an image once, in memory, as a JPEG no larger than `max_side`
+    pixels on its longest side. Bytes are assumed to be encoded already and
+    are passed through untouched.
+    """
+    if isinstance(image, bytes):
+        return image
+    if isinstance(image, str):
+        image = Image.open(image)
+    if max(image.size) > max_side:
+        image = image.copy()
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    if image.mode not in ("L", "RGB"):
+        # Covers binarized ("1") and alpha images, which JPEG can't store
+        image = image.convert("L" if image.mode in ("1", "LA") else "RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
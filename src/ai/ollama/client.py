@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, TypeVar, Union
+import ollama
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ChatResult(NamedTuple):
+    content: str
+    # Generated tokens per second of decode time, 0.0 when not reported
+    tokens_per_second: float
+    # Time the server spent loading the model for this call; ~0 when it was warm
+    load_seconds: float
+    total_seconds: float
+
+
+class OllamaClient:
+    """
+    A throughput-oriented wrapper around one reused `ollama.Client`.
+
+    Every call asks the server to keep the model loaded for `keep_alive`
+    (seconds or a duration string such as "30m"; -1 keeps it forever), so
+    idle gaps between labels don't pay a cold load. warm() loads a model ahead
+    of the first real request. Output is capped at `num_predict` tokens, since
+    answers are two short lines. chat_many() keeps up to `parallel` requests
+    open at once, which should match the server's OLLAMA_NUM_PARALLEL. Token
+    rate and load time are logged for every call and returned with the answer.
+
+    Backends built without a client share the one from OllamaClient.shared(),
+    so the text and vision models use one HTTP connection pool and one
+    executor.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, host: Optional[str] = None, keep_alive: Union[float, str, None] = None,
+                 num_predict: Optional[int] = None, parallel: Optional[int] = None):
+        self.host = host or Config.ollama_host
+        self.keep_alive = keep_alive if keep_alive is not None else Config.ollama_keep_alive
+        self.num_predict = num_predict if num_predict is not None else Config.ollama_num_predict
+        self.parallel = parallel or Config.ollama_num_parallel
+        self.client = ollama.Client(host=self.host)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "OllamaClient":
+        """The process-wide client configured from Config, created on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def warm(self, *models: str):
+        """Loads the models into memory without generating anything."""
+        for model in models:
+            # An empty prompt only loads the model and applies keep_alive
+            response = self.client.generate(model=model, prompt="", keep_alive=self.keep_alive)
+            logger.info(f"warmed {model} in {_seconds(response.get('load_duration')):.2f}s")
+
+    def chat(self, model: str, messages: Sequence[Mapping], **options) -> ChatResult:
+        response = self.client.chat(
+            model=model,
+            messages=messages,
+            options={"num_predict": self.num_predict, **options},
+            keep_alive=self.keep_alive,
+        )
+        result = ChatResult(
+            content=response["message"]["content"],
+            tokens_per_second=_rate(response.get("eval_count"), response.get("eval_duration")),
+            load_seconds=_seconds(response.get("load_duration")),
+            total_seconds=_seconds(response.get("total_duration")),
+        )
+        logger.info(
+            f"{model}: {result.tokens_per_second:.1f} tok/s, load {result.load_seconds:.2f}s, "
+            f"total {result.total_seconds:.2f}s"
+        )
+        return result
+
+    def chat_stream(self, model: str, messages: Sequence[Mapping], **options) -> Iterator[str]:
+        """
+        Yields the reply as it is generated. Closing the generator early closes
+        the HTTP response, which stops the generation on the server.
+        """
+        start = time.perf_counter()
+        chunks = self.client.chat(
+            model=model,
+            messages=messages,
+            options={"num_predict": self.num_predict, **options},
+            keep_alive=self.keep_alive,
+            stream=True,
+        )
+        try:
+            for chunk in chunks:
+                yield chunk["message"]["content"]
+        finally:
+            chunks.close()
+            logger.info(f"{model}: streamed for {time.perf_counter() - start:.2f}s")
+
+    def chat_many(self, model: str, conversations: Iterable[Sequence[Mapping]], **options) -> List[ChatResult]:
+        """Runs the conversations concurrently and returns results in input order."""
+        return self.map(lambda messages: self.chat(model, messages, **options), conversations)
+
+    def map(self, function: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Applies a function that calls chat() to each item, `parallel` at a time, in input order."""
+        return list(self._get_executor().map(function, items))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix="ollama")
+            return self._executor
+
+    def close(self):
+        with OllamaClient._shared_lock:
+            if OllamaClient._shared is self:
+                # The next shared() call starts a fresh client
+                OllamaClient._shared = None
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _seconds(nanoseconds) -> float:
+    return (nanoseconds or 0) / 1e9
+
+
+def _rate(count, nanoseconds) -> float:
+    return count / _seconds(nanoseconds) if count and nanoseconds else 0.0
@@ -1,14 +1,25 @@
-from typing import Tuple
-import ollama
+import threading
+from typing import Iterable, List, Tuple
+from ai.cache import AnswerCache
+from ai.ollama.client import OllamaClient
+from ai.stream import read_answer
 from config import Config
 
 
 class Text:
 
-    def __init__(self):
+    def __init__(self, cache: AnswerCache = None, client: OllamaClient = None, stream: bool = False):
         self.model = Config.ollama_text_model
+        self.cache = cache
+        # Stream replies and stop reading as soon as both lines are in
+        self.stream = stream
+        self.client = client or OllamaClient.shared()
 
-    def get_album_name_and_side(self, vinyl_label_text: str) -> Tuple[str, int]:
+    def warm(self):
+        """Loads the model on the server now, so the first label doesn't pay for it."""
+        self.client.warm(self.model)
+
+    def get_album_name_and_side(self, vinyl_label_text: str, cancel: threading.Event = None) -> Tuple[str, int]:
         prompt = lambda text: f"""
         Extract the vinyl album name and vinyl side from the following text:
 
@@ -17,12 +28,36 @@ class Text:
         Respond in the format: "Album Name\nn" where n is an integer equal to the vinyl side. Do not include quotes or any other text.
         """
         query = prompt(vinyl_label_text)
+        if self.cache is None:
+            return self._ask(query, cancel)
+        # The label text is part of the query, so the query alone is the content
+        return self.cache.memoize(self.model, "", query, lambda: self._ask(query, cancel))
+
+    def get_album_name_and_side_many(self, vinyl_label_texts: Iterable[str]) -> List[List[str]]:
+        """Answers for several labels, sent concurrently up to the client's parallelism."""
+        return self.client.map(self.get_album_name_and_side, vinyl_label_texts)
+
+    def _ask(self, query: str, cancel: threading.Event = None) -> List[str]:
+        if self.stream:
+            return self._query_stream(query, cancel)
         response = self._query(query)
         lines = response.split("\n")
         return lines
 
     def _query(self, query: str) -> str:
-        response = ollama.chat(
+        response = self.client.chat(
+            model=self.model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": query
+                }
+            ]
+        )
+        return response.content
+
+    def _query_stream(self, query: str, cancel: threading.Event = None) -> List[str]:
+        chunks = self.client.chat_stream(
             model=self.model,
             messages=[
                 {
@@ -31,4 +66,7 @@ class Text:
                 }
             ]
         )
-        return response["message"]["content"]
+        try:
+            return read_answer(chunks, cancel)
+        finally:
+            chunks.close()
@@ -1,14 +1,30 @@
-from typing import Tuple
-import ollama
+import threading
+from typing import Iterable, List, Tuple
+from PIL import Image
+from ai.cache import AnswerCache
+from ai.image import ImageInput, encode_image
+from ai.ollama.client import OllamaClient
+from ai.stream import read_answer
 from config import Config
 
 
 class Vision:
 
-    def __init__(self):
+    def __init__(self, max_side: int = 1024, quality: int = 85, cache: AnswerCache = None,
+                 client: OllamaClient = None, stream: bool = False):
         self.model = Config.ollama_vision_model
+        # Stream replies and stop reading as soon as both lines are in
+        self.stream = stream
+        self.client = client or OllamaClient.shared()
+        self.max_side = max_side
+        self.quality = quality
+        self.cache = cache
 
-    def get_album_name_and_side(self, image_path: str) -> Tuple[str, int]:
+    def warm(self):
+        """Loads the model on the server now, so the first label doesn't pay for it."""
+        self.client.warm(self.model)
+
+    def get_album_name_and_side(self, image: ImageInput, cancel: threading.Event = None) -> Tuple[str, int]:
         query = """
         This is an image of a vinyl record label, including the "center label" or "vinyl label" area in the middle of the record.
         I need you to extract the vinyl album name and vinyl side from the image.
@@ -18,19 +34,50 @@ class Vision:
         Respond in the format: "Album Name\nn" where n is an integer equal to the vinyl side.
         Do not include quotes or any other text in your response.
         """
-        response = self._query(query, image_path)
+        image_bytes = encode_image(image, max_side=self.max_side, quality=self.quality)
+        if self.cache is None:
+            return self._ask(query, image_bytes, cancel)
+        return self.cache.memoize(
+            self.model, query, image_bytes, lambda: self._ask(query, image_bytes, cancel),
+            image=image if isinstance(image, Image.Image) else image_bytes
+        )
+
+    def get_album_name_and_side_many(self, images: Iterable[ImageInput]) -> List[List[str]]:
+        """Answers for several labels, sent concurrently up to the client's parallelism."""
+        return self.client.map(self.get_album_name_and_side, images)
+
+    def _ask(self, query: str, image_bytes: bytes, cancel: threading.Event = None) -> List[str]:
+        if self.stream:
+            return self._query_stream(query, image_bytes, cancel)
+        response = self._query(query, image_bytes)
         lines = response.split("\n")
         return lines
 
-    def _query(self, query: str, image_path: str) -> str:
-        response = ollama.chat(
+    def _query(self, query: str, image_bytes: bytes) -> str:
+        response = self.client.chat(
+            model=self.model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": query,
+                    "images": [image_bytes]
+                }
+            ]
+        )
+        return response.content
+
+    def _query_stream(self, query: str, image_bytes: bytes, cancel: threading.Event = None) -> List[str]:
+        chunks = self.client.chat_stream(
             model=self.model,
             messages=[
                 {
                     "role": "user",
                     "content": query,
-                    "images": [image_path]
+                    "images": [image_bytes]
                 }
             ]
         )
-        return response["message"]["content"]
+        try:
+            return read_answer(chunks, cancel)
+        finally:
+            chunks.close()
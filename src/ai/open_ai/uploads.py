@@ -0,0 +1,129 @@
+import base64
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UploadManager:
+    """
+    Decides how a label image reaches the Responses API and avoids re-uploading.
+
+    Images up to `inline_max_bytes` are sent inline as a base64 data URL, which
+    skips the files endpoint entirely. Larger ones are uploaded once per
+    distinct content (by SHA-256) and their file_id is reused afterwards;
+    concurrent requests for the same content wait for a single upload.
+
+    Uploaded files are named with `prefix`, and a background thread, started
+    with start(), deletes files carrying that prefix once they are older than
+    `ttl` seconds, every `cleanup_interval` seconds. That includes ones left
+    behind by earlier runs, but never files other programs uploaded with the
+    same API key.
+    """
+
+    def __init__(self, client, inline_max_bytes: int = 512 * 1024, ttl: float = 24 * 60 * 60,
+                 cleanup_interval: float = 10 * 60, prefix: str = "vinylvision-"):
+        self.client = client
+        self.prefix = prefix
+        self.inline_max_bytes = inline_max_bytes
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self.uploads = 0
+        self.reuses = 0
+        self.inlined = 0
+        # sha256 of the image bytes -> (file_id, uploaded at)
+        self._files: Dict[str, Tuple[str, float]] = {}
+        # sha256 -> lock held while that content is being uploaded
+        self._uploading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._cleaner = None
+
+    def image_content(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> dict:
+        """The input_image content part to send for these bytes."""
+        if len(image_bytes) <= self.inline_max_bytes:
+            self.inlined += 1
+            data = base64.b64encode(image_bytes).decode("ascii")
+            return {"type": "input_image", "image_url": f"data:{mime_type};base64,{data}"}
+        return {"type": "input_image", "file_id": self.file_id(image_bytes, mime_type)}
+
+    def file_id(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> str:
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        with self._lock:
+            known = self._known(digest)
+            if known is not None:
+                return known
+            uploading = self._uploading.setdefault(digest, threading.Lock())
+        with uploading:
+            # Someone else may have uploaded the same content while we waited
+            with self._lock:
+                known = self._known(digest)
+                if known is not None:
+                    return known
+            try:
+                result = self.client.files.create(
+                    file=(f"{self.prefix}{digest[:16]}.jpg", image_bytes, mime_type),
+                    purpose="vision",
+                )
+            except BaseException:
+                with self._lock:
+                    self._uploading.pop(digest, None)
+                raise
+            # Recorded in the same step that retires the upload lock, so a caller
+            # arriving in between can't miss both and upload again
+            with self._lock:
+                self._files[digest] = (result.id, time.time())
+                self._uploading.pop(digest, None)
+                self.uploads += 1
+            return result.id
+
+    def _known(self, digest: str):
+        known = self._files.get(digest)
+        if known is not None and time.time() - known[1] < self.ttl:
+            self.reuses += 1
+            return known[0]
+        return None
+
+    def cleanup_expired(self) -> int:
+        """Deletes this manager's vision files older than the TTL. Returns how many were deleted."""
+        cutoff = time.time() - self.ttl
+        deleted = 0
+        for file in self.client.files.list(purpose="vision"):
+            if not (file.filename or "").startswith(self.prefix) or file.created_at >= cutoff:
+                continue
+            try:
+                self.client.files.delete(file.id)
+                deleted += 1
+            except Exception:
+                logger.warning(f"could not delete expired file {file.id}", exc_info=True)
+        with self._lock:
+            self._files = {
+                digest: entry for digest, entry in self._files.items() if entry[1] >= cutoff
+            }
+        return deleted
+
+    def start(self):
+        """Starts cleaning up expired files in the background."""
+        if self._cleaner is not None:
+            return
+        self._stop.clear()
+        self._cleaner = threading.Thread(target=self._clean_periodically, name="openai-file-cleanup", daemon=True)
+        self._cleaner.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._cleaner is not None:
+            self._cleaner.join()
+            self._cleaner = None
+
+    def _clean_periodically(self):
+        while not self._stop.wait(self.cleanup_interval):
+            try:
+                deleted = self.cleanup_expired()
+                if deleted:
+                    logger.info(f"deleted {deleted} expired vision files")
+            except Exception:
+                logger.warning("expired file cleanup failed", exc_info=True)
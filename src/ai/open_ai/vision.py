@@ -1,16 +1,36 @@
-from typing import Tuple
-from openai import OpenAI
+import asyncio
+import random
+import threading
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional, Tuple
+import openai
+from openai import AsyncOpenAI, OpenAI
+from PIL import Image
 
+from ai.cache import AnswerCache
+from ai.image import ImageInput, encode_image
+from ai.open_ai.uploads import UploadManager
+from ai.stream import read_answer
 from config import Config
 
 
-class Vision:
-    def __init__(self):
-        self.model = Config.open_ai_vision_model
-        self.client = OpenAI(api_key=Config.open_ai_key)
+# Errors worth retrying in batch mode; anything else is reported straight away
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+class Identification(NamedTuple):
+    # Position of the image in the batch passed to identify_many
+    index: int
+    lines: Optional[List[str]]
+    error: Optional[Exception] = None
 
-    def get_album_name_and_side(self, image_path: str) -> Tuple[str, int]:
-        query = """
+
+class Vision:
+    QUERY = """
         This is an image of a vinyl record label, including the "center label" or "vinyl label" area in the middle of the record.
         I need you to extract the vinyl album name and vinyl side from the image.
         The album name is usually at the top of the label, and the vinyl side is usually a number or letter at the bottom.
@@ -19,31 +39,139 @@ class Vision:
         Respond in the format: "Album Name\nn" where n is an integer equal to the vinyl side.
         Do not include quotes or any other text in your response.
         """
-        file_id = self._create_file(image_path)
-        response = self._query(query, file_id)
+
+    def __init__(self, max_side: int = 1024, quality: int = 85, cache: AnswerCache = None,
+                 uploads: UploadManager = None, stream: bool = False):
+        self.model = Config.open_ai_vision_model
+        # Stream replies and stop reading as soon as both lines are in
+        self.stream = stream
+        self.client = OpenAI(api_key=Config.open_ai_key, base_url=Config.open_ai_base_url)
+        self._async_client = None
+        self.uploads = uploads if uploads is not None else UploadManager(self.client)
+        self.max_side = max_side
+        self.quality = quality
+        self.cache = cache
+
+    def get_album_name_and_side(self, image: ImageInput, cancel: threading.Event = None) -> Tuple[str, int]:
+        query = self.QUERY
+        image_bytes = encode_image(image, max_side=self.max_side, quality=self.quality)
+        if self.cache is None:
+            return self._ask(query, image_bytes, cancel)
+        return self.cache.memoize(
+            self.model, query, image_bytes, lambda: self._ask(query, image_bytes, cancel),
+            image=image if isinstance(image, Image.Image) else image_bytes
+        )
+
+    def _ask(self, query: str, image_bytes: bytes, cancel: threading.Event = None) -> List[str]:
+        if self.stream:
+            return self._query_stream(query, self.uploads.image_content(image_bytes), cancel)
+        response = self._query(query, self.uploads.image_content(image_bytes))
         lines = response.split("\n")
         return lines
 
-    def _create_file(self, file_path: str) -> str:
-        with open(file_path, "rb") as file_content:
-            result = self.client.files.create(
-                file=file_content,
-                purpose="vision",
-            )
-            return result.id
-
-    def _query(self, query: str, file_id: str) -> str:
+    def _query(self, query: str, image_content: dict) -> str:
         response = self.client.responses.create(
             model=self.model,
             input=[{  
                 "role": "user",
                 "content": [
                     {"type": "input_text", "text": query},
-                    {
-                        "type": "input_image",
-                        "file_id": file_id,
-                    },
+                    image_content,
                 ],
             }]
         )
         return response.output_text
+
+    def _query_stream(self, query: str, image_content: dict, cancel: threading.Event = None) -> List[str]:
+        stream = self.client.responses.create(
+            model=self.model,
+            input=[{
+                "role": "user",
+                "content": [
+                    {"type": "input_text", "text": query},
+                    image_content,
+                ],
+            }],
+            stream=True,
+        )
+        try:
+            return read_answer(
+                (event.delta for event in stream if event.type == "response.output_text.delta"), cancel
+            )
+        finally:
+            # Closing the response is what stops the generation early
+            stream.close()
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            # Retries are handled per request in identify_many
+            self._async_client = AsyncOpenAI(
+                api_key=Config.open_ai_key, base_url=Config.open_ai_base_url, max_retries=0
+            )
+        return self._async_client
+
+    async def identify_many(self, images: Iterable[ImageInput], max_in_flight: int = 8,
+                            max_retries: int = 5, backoff_base: float = 1.0,
+                            backoff_max: float = 60.0) -> AsyncIterator[Identification]:
+        """
+        Identifies a batch of label images concurrently, keeping at most
+        `max_in_flight` requests open, and yields an Identification for each
+        image as soon as it finishes (not in input order). Rate limits,
+        timeouts and server errors are retried with jittered exponential
+        backoff; an image that still fails is yielded with its error instead of
+        stopping the batch.
+        """
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def identify(index, image):
+            async with semaphore:
+                try:
+                    image_bytes = await asyncio.to_thread(
+                        encode_image, image, max_side=self.max_side, quality=self.quality
+                    )
+
+                    async def ask():
+                        return await self._ask_async(image_bytes, max_retries, backoff_base, backoff_max)
+
+                    if self.cache is None:
+                        lines = await ask()
+                    else:
+                        lines = await self.cache.memoize_async(
+                            self.model, self.QUERY, image_bytes, ask,
+                            image=image if isinstance(image, Image.Image) else image_bytes
+                        )
+                    return Identification(index, lines)
+                except Exception as e:
+                    return Identification(index, None, e)
+
+        tasks = [asyncio.create_task(identify(i, image)) for i, image in enumerate(images)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _ask_async(self, image_bytes: bytes, max_retries: int, backoff_base: float,
+                         backoff_max: float) -> List[str]:
+        # Uploads, when needed, reuse the deduplicating sync manager off the loop
+        image_content = await asyncio.to_thread(self.uploads.image_content, image_bytes)
+        for attempt in range(max_retries + 1):
+            try:
+                response = await self.async_client.responses.create(
+                    model=self.model,
+                    input=[{
+                        "role": "user",
+                        "content": [
+                            {"type": "input_text", "text": self.QUERY},
+                            image_content,
+                        ],
+                    }]
+                )
+                return response.output_text.split("\n")
+            except RETRYABLE_ERRORS:
+                if attempt == max_retries:
+                    raise
+                ceiling = min(backoff_max, backoff_base * 2 ** attempt)
+                await asyncio.sleep(random.uniform(ceiling / 2, ceiling))
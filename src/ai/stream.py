@@ -0,0 +1,61 @@
+import re
+import threading
+from typing import Iterable, List, Optional
+from ai.answer import MAX_ALBUM_NAME_LENGTH, is_album_name, parse_side
+
+# A side on the line after the album name ("2", "B", "Side B"), only once
+# its line has ended, so "B" isn't taken from the start of "Bonus"
+_SIDE = re.compile(r"\s*(?:side\s*[:.]?\s*)?([a-z]|\d{1,2})(?=[ \t.]*\n)", re.IGNORECASE)
+
+
+class StreamCancelled(Exception):
+    """Raised when a streamed answer is abandoned because its cancel event was set."""
+
+
+def complete_answer(text: str) -> Optional[List[str]]:
+    """
+    The "Album Name\\nside" lines once `text` holds both of them completely
+    and both are valid (see ai.answer), otherwise None.
+    """
+    album_name, newline, rest = text.lstrip().partition("\n")
+    if not newline or not is_album_name(album_name):
+        return None
+    side = _SIDE.match(rest)
+    if side is not None and parse_side(side.group(1)) is not None:
+        return [album_name.strip(), side.group(1)]
+    return None
+
+
+def unusable_answer(text: str) -> bool:
+    """
+    Whether `text` can no longer become a valid answer however it goes on:
+    its first line is a refusal or prose, or a finished second line isn't a
+    side. A model that starts explaining itself is cut off on this.
+    """
+    album_name, newline, rest = text.lstrip().partition("\n")
+    if newline and not is_album_name(album_name):
+        return True
+    if not newline:
+        return len(album_name) > MAX_ALBUM_NAME_LENGTH
+    line, newline, _ = rest.lstrip("\n").partition("\n")
+    return bool(newline) and parse_side(line) is None
+
+
+def read_answer(chunks: Iterable[str], cancel: threading.Event = None) -> List[str]:
+    """
+    Reads streamed text chunks only until complete_answer() is satisfied, or
+    the reply is unusable, so the caller can abort the rest of the generation.
+    Otherwise the text read is split into lines as a full response would be,
+    for the caller to validate with parse_answer().
+    """
+    text = ""
+    for chunk in chunks:
+        if cancel is not None and cancel.is_set():
+            raise StreamCancelled()
+        text += chunk
+        lines = complete_answer(text)
+        if lines is not None:
+            return lines
+        if unusable_answer(text):
+            break
+    return text.split("\n")
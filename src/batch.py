@@ -0,0 +1,208 @@
+"""
+Identifies a whole crate of label photos in one run.
+
+Takes directories, globs or files, runs every distinct image through the
+same pipeline as the service (concurrently, with backpressure) and streams
+one row per image to JSONL or CSV as results come in. Identical images are
+identified once. Successfully identified images are recorded, by path and
+content hash, in a checkpoint file, so a rerun skips them and retries only
+what failed or never finished.
+
+    python src/batch.py src/resources --output results.jsonl
+    python src/batch.py "crate/**/*.jpg" --output results.csv --identify-workers 16
+"""
+import csv
+import glob
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+from service import IdentificationService, Job, warm_up
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff"}
+
+CSV_FIELDS = [
+    "path", "sha256", "duplicate_of", "album_name", "side", "side_letter", "stage", "release_id", "title",
+    "confidence", "error", "seconds",
+]
+
+
+def find_images(inputs: Iterable[str], recursive: bool = False) -> List[str]:
+    """Expands directories and glob patterns into a sorted list of image files."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        else:
+            candidates = glob.glob(item, recursive=True) or [item]
+        paths.update(
+            path for path in candidates
+            if os.path.isfile(path) and os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+        )
+    return sorted(paths)
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def group_by_digest(paths: Iterable[str]) -> Dict[str, List[str]]:
+    """Paths grouped by content hash, in the order each content was first seen."""
+    groups: Dict[str, List[str]] = {}
+    for path in paths:
+        groups.setdefault(file_digest(path), []).append(path)
+    return groups
+
+
+def load_checkpoint(path: str) -> Set[Tuple[str, str]]:
+    """(sha256, path) pairs already identified."""
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        entries = (line.rstrip("\n").split("\t", 1) for line in f)
+        return {tuple(entry) for entry in entries if len(entry) == 2}
+
+
+def pending_groups(groups: Dict[str, List[str]], finished: Set[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """The paths of each content hash that the checkpoint doesn't cover yet."""
+    pending = {}
+    for digest, paths in groups.items():
+        remaining = [path for path in paths if (digest, path) not in finished]
+        if remaining:
+            pending[digest] = remaining
+    return pending
+
+
+class ResultWriter:
+    """Appends result rows to a .jsonl or .csv file, flushing each one."""
+
+    def __init__(self, path: str):
+        self.csv = path.lower().endswith(".csv")
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        self._writer = None
+        if self.csv:
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if new:
+                self._writer.writeheader()
+
+    def write(self, row: dict):
+        if self.csv:
+            self._writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def result_rows(job: Job, digest: str, paths: List[str]) -> List[dict]:
+    result = job.to_dict()
+    result.pop("id")
+    result["seconds"] = result.pop("timings").get("total")
+    return [
+        {"path": path, "sha256": digest, "duplicate_of": paths[0] if i else None, **result}
+        for i, path in enumerate(paths)
+    ]
+
+
+def run_batch(service: IdentificationService, groups: Dict[str, List[str]], writer: ResultWriter,
+              checkpoint_path: str) -> int:
+    """
+    Submits one image per content hash and writes rows for every path as
+    each finishes. Returns the number of images identified.
+    """
+    results = queue.Queue()
+
+    def submit_all():
+        for digest, paths in groups.items():
+            try:
+                with open(paths[0], "rb") as f:
+                    image_bytes = f.read()
+                # Blocks while the pipeline is full instead of reading every file up front
+                service.submit(image_bytes, block=True,
+                               on_done=lambda job, digest=digest, paths=paths: results.put((digest, paths, job)))
+            except Exception as e:
+                # Every group must put exactly one result, or the loop below waits forever
+                logger.warning(f"could not submit {paths[0]}", exc_info=True)
+                results.put((digest, paths, e))
+
+    threading.Thread(target=submit_all, name="batch-submit", daemon=True).start()
+    failed = 0
+    with open(checkpoint_path, "a") as checkpoint:
+        for done in range(1, len(groups) + 1):
+            digest, paths, job = results.get()
+            if isinstance(job, Exception):
+                rows = [{"path": path, "sha256": digest, "error": str(job)} for path in paths]
+            else:
+                rows = result_rows(job, digest, paths)
+            for row in rows:
+                writer.write(row)
+            if rows[0].get("error"):
+                # Left out of the checkpoint so the next run retries it
+                failed += 1
+            else:
+                # Only after its rows are safely written does an image count as done
+                checkpoint.writelines(f"{digest}\t{path}\n" for path in paths)
+                checkpoint.flush()
+            logger.info(f"{done}/{len(groups)} {paths[0]}: {rows[0].get('album_name') or rows[0].get('error')}")
+    return len(groups) - failed
+
+
+if __name__ == "__main__":
+    import argparse
+    from config.logging_config import configure_logging
+    from main import build_cascade, build_client
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="image files, directories or glob patterns")
+    parser.add_argument("--output", "-o", default="results.jsonl", help="results file, .jsonl or .csv")
+    parser.add_argument("--checkpoint", help="identified-image log (default: <output>.checkpoint)")
+    parser.add_argument("--recursive", "-r", action="store_true", help="descend into subdirectories")
+    parser.add_argument("--queue-size", type=int, default=16)
+    parser.add_argument("--preprocess-workers", type=int, default=2)
+    parser.add_argument("--identify-workers", type=int, default=8)
+    parser.add_argument("--lookup-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    configure_logging()
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    groups = group_by_digest(find_images(args.inputs, args.recursive))
+    total = sum(len(paths) for paths in groups.values())
+    pending = pending_groups(groups, load_checkpoint(checkpoint_path))
+    remaining = sum(len(paths) for paths in pending.values())
+    logger.info(
+        f"{total} images, {len(groups)} distinct, {total - remaining} already done, "
+        f"{len(pending)} to identify"
+    )
+
+    if pending:
+        client = build_client()
+        cascade = build_cascade(client)
+        warm_up(cascade)
+        service = IdentificationService(
+            client, cascade, queue_size=args.queue_size, preprocess_workers=args.preprocess_workers,
+            identify_workers=args.identify_workers, lookup_workers=args.lookup_workers,
+            tracklist_workers=args.lookup_workers,
+        )
+        service.start()
+        writer = ResultWriter(args.output)
+        try:
+            identified = run_batch(service, pending, writer, checkpoint_path)
+        finally:
+            writer.close()
+            service.stop()
+            client.close()
+        logger.info(f"identified {identified} of {len(pending)} images, results in {args.output}")
+        logger.info(f"cascade: {json.dumps(cascade.stats.summary())}")
@@ -0,0 +1,78 @@
+"""
+Memory and throughput benchmark for the Discogs model objects.
+
+Builds a collection of fully loaded releases in memory and reports the
+allocated size per release along with how fast tracklists can be re-read.
+
+    python src/bench_models.py --releases 10000 --tracks 12
+"""
+import argparse
+import time
+import tracemalloc
+from discogs.model import Release
+
+
+class _OfflineClient:
+    _base_url = "https://api.discogs.com"
+
+    def _get(self, url):
+        raise AssertionError(f"benchmark objects must not hit the network ({url})")
+
+
+def _release_dict(release_id: int, num_tracks: int) -> dict:
+    return {
+        "id": release_id,
+        "title": f"Release {release_id}",
+        "year": 1977,
+        "tracklist": [
+            {"position": f"{'AB'[i * 2 // num_tracks]}{i + 1}", "title": f"Track {i}", "duration": "3:45"}
+            for i in range(num_tracks)
+        ],
+    }
+
+
+def build_collection(num_releases: int, num_tracks: int) -> list:
+    client = _OfflineClient()
+    releases = []
+    for release_id in range(num_releases):
+        release = Release(client, _release_dict(release_id, num_tracks))
+        release._loaded = True
+        releases.append(release)
+    return releases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--releases", type=int, default=10000)
+    parser.add_argument("--tracks", type=int, default=12)
+    parser.add_argument("--reads", type=int, default=10, help="tracklist reads per release")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    releases = build_collection(args.releases, args.tracks)
+    objects_size, _ = tracemalloc.get_traced_memory()
+    for release in releases:
+        release.tracklist
+    build_seconds = time.perf_counter() - start
+    tracklists_size = tracemalloc.get_traced_memory()[0] - objects_size
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    titles = 0
+    for _ in range(args.reads):
+        for release in releases:
+            for track in release.tracklist:
+                titles += len(track.title)
+    read_seconds = time.perf_counter() - start
+    total_reads = args.reads * args.releases
+
+    print(f"releases:            {args.releases} x {args.tracks} tracks")
+    print(f"build + first read:  {build_seconds:.3f}s")
+    print(f"release objects:     {objects_size / 2**20:.1f} MiB ({objects_size / args.releases:.0f} B/release)")
+    print(f"cached tracklists:   {tracklists_size / 2**20:.1f} MiB ({tracklists_size / args.releases:.0f} B/release)")
+    print(f"tracklist reads:     {total_reads / read_seconds:,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
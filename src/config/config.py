@@ -3,11 +3,29 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _duration(value: str):
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
 class _Config:
 
     def __init__(self):
         self.ollama_text_model: str = "mistral"
         self.ollama_vision_model: str = "llama3.2-vision"
         self.open_ai_vision_model: str = "gpt-4.1-mini"
+        self.ollama_host: str = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
+        # Seconds (-1 keeps the model loaded indefinitely) or a duration such as "30m"
+        self.ollama_keep_alive = _duration(os.getenv("OLLAMA_KEEP_ALIVE", "30m"))
+        self.ollama_num_predict: int = int(os.getenv("OLLAMA_NUM_PREDICT", "48"))
+        # Should match the server's own OLLAMA_NUM_PARALLEL
+        self.ollama_num_parallel: int = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
         self.discogs_pat: str = os.getenv("DISCOGS_PAT")
         self.open_ai_key: str = os.getenv("OPEN_AI_KEY")
+        # Points the OpenAI clients at a compatible or stub server when set
+        self.open_ai_base_url: str = os.getenv("OPEN_AI_BASE_URL")
+        self.discogs_cache_path: str = os.getenv("DISCOGS_CACHE_PATH", ".cache/discogs.sqlite")
+        self.discogs_index_path: str = os.getenv("DISCOGS_INDEX_PATH")
+        self.answer_cache_path: str = os.getenv("ANSWER_CACHE_PATH", ".cache/answers.sqlite")
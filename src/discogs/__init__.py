@@ -1 +1,5 @@
-from .client import Client
\ No newline at end of file
+from .client import Client
+from .async_client import AsyncClient
+from .cache import ResponseCache
+from .ratelimit import RateLimiter
+from .local_index import LocalIndex
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import discogs.model as models
+from discogs.cache import ResponseCache
+from discogs.client import Client, _pending_refreshes
+from discogs.ratelimit import RateLimiter
+
+
+class AiohttpFetcher:
+    """
+    Fetches via HTTP from the Discogs API on an asyncio event loop.
+
+    AsyncClient only relies on the async fetch()/close() pair, so any object
+    with the same interface (an in-memory stand-in, an httpx transport, ...)
+    can be passed in its place.
+    """
+    def __init__(self, pool_size=10, timeout=10):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+
+    def _get_session(self):
+        # aiohttp sessions must be created inside a running event loop
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def fetch(self, client, method, url, data=None, headers=None, json=True):
+        async with self._get_session().request(method, url, data=data, headers=headers) as resp:
+            content = await resp.read()
+            return content, resp.status, resp.headers
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class _AsyncPaginatedMixin:
+    """
+    Awaitable counterparts of the BasePaginatedResponse accessors.
+
+    Call `await lst.load()` before reading `pages`/`count`, and iterate with
+    `async for`; pages are requested concurrently, `prefetch` at a time.
+    """
+
+    async def _load_pagination_info(self):
+        data = await self.client._get(self._url_for_page(1))
+        self._store_page(1, data)
+        self._num_pages = data['pagination']['pages']
+        self._num_items = data['pagination']['items']
+
+    async def load(self):
+        if self._num_pages is None:
+            await self._load_pagination_info()
+        return self
+
+    @property
+    def pages(self):
+        self._require_loaded()
+        return self._num_pages
+
+    @property
+    def count(self):
+        self._require_loaded()
+        return self._num_items
+
+    def _require_loaded(self):
+        if self._num_pages is None:
+            raise RuntimeError("pagination info is not loaded yet, 'await .load()' first")
+
+    async def page(self, index):
+        if index not in self._pages:
+            self._store_page(index, await self.client._get(self._url_for_page(index)))
+        return self._pages[index]
+
+    async def fetch_pages(self, indexes):
+        """Requests several pages at once and returns them in order."""
+        return await asyncio.gather(*[self.page(i) for i in indexes])
+
+    async def __aiter__(self):
+        self._widen_pages()
+        await self.load()
+        window = max(1, self.prefetch)
+        for start in range(1, self._num_pages + 1, window):
+            indexes = range(start, min(start + window, self._num_pages + 1))
+            for page in await self.fetch_pages(indexes):
+                for item in page:
+                    yield item
+
+    def __getitem__(self, index):
+        raise TypeError("use 'await .page(n)' on an async paginated list")
+
+    def __iter__(self):
+        raise TypeError("use 'async for' on an async paginated list")
+
+    def __len__(self):
+        return self.count
+
+
+class AsyncPaginatedList(_AsyncPaginatedMixin, models.PaginatedList):
+    """A paginated list of objects of a particular class, fetched asynchronously."""
+
+
+class AsyncMixedPaginatedList(_AsyncPaginatedMixin, models.MixedPaginatedList):
+    """A paginated list of mixed objects, fetched asynchronously."""
+
+
+class AsyncClient:
+    """
+    An asyncio counterpart of Client.
+
+    Requests share the same ResponseCache and RateLimiter types as the
+    synchronous client; pass the same RateLimiter instance to both to keep them
+    under one quota. Model objects returned from here are the regular
+    discogs.model classes, loaded with `await obj.refresh_async()` or in bulk
+    with `await client.refresh_many(objs)`.
+    """
+    RETRY_STATUSES = Client.RETRY_STATUSES
+    BASE_URL = Client.BASE_URL
+    _base_url = Client._base_url
+
+    def __init__(self, token: str, user_agent: str = "VinylVision/1.0", pool_size: int = 10,
+                 max_retries: int = 3, timeout: float = 10, cache: ResponseCache = None,
+                 rate_limiter: RateLimiter = None, fetcher=None):
+        self.headers = {
+            "Authorization": f"Discogs token={token}",
+            "User-Agent": user_agent
+        }
+        self._fetcher = fetcher if fetcher is not None else AiohttpFetcher(pool_size=pool_size, timeout=timeout)
+        self.cache = cache
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Release the pooled connections held by this client."""
+        await self._fetcher.close()
+
+    async def _get(self, url):
+        return await self._request('GET', url)
+
+    async def _request(self, method, url, data=None):
+        cacheable = self.cache is not None and method == 'GET'
+        if cacheable:
+            content = self.cache.get(method, url)
+            if content is not None:
+                return json.loads(content.decode('utf8'))
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire_async()
+            content, status_code, headers = await self._fetcher.fetch(
+                self, method, url, data=data, headers=self.headers
+            )
+            self.rate_limiter.update(headers)
+            if status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                break
+            await asyncio.sleep(self.rate_limiter.backoff(attempt, headers.get('Retry-After')))
+
+        if cacheable and status_code == 200:
+            self.cache.set(method, url, content)
+
+        return Client._decode(content, status_code)
+
+    def search(self, *query, **fields):
+        """
+        Search the Discogs database. Returns an async paginated list of objects
+        (Artists, Releases, Masters, and Labels). The keyword arguments to this
+        function are serialized into the request's query string.
+        """
+        return AsyncMixedPaginatedList(self, Client._search_url(query, fields), 'results')
+
+    async def refresh_many(self, objects, max_concurrency=None):
+        """Refreshes many PrimaryAPIObjects concurrently."""
+        if max_concurrency is None:
+            await asyncio.gather(*[obj.refresh_async() for obj in objects])
+            return objects
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def refresh(obj):
+            async with semaphore:
+                await obj.refresh_async()
+
+        await asyncio.gather(*[refresh(obj) for obj in objects])
+        return objects
+
+    async def hydrate(self, objects, fields=None, max_concurrency=8):
+        """
+        Fully loads a batch of PrimaryAPIObjects concurrently. See
+        Client.hydrate; objects sharing a resource_url are fetched once.
+        """
+        by_url = _pending_refreshes(objects, fields)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def get(url):
+            async with semaphore:
+                return await self._get(url)
+
+        results = await asyncio.gather(*[get(url) for url in by_url])
+        for same_resource, data in zip(by_url.values(), results):
+            for obj in same_resource:
+                obj._apply_refresh(data)
+        return objects
@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+class ResponseCache:
+    """
+    A two-tier cache of raw Discogs API responses, keyed on method + URL.
+
+    Entries live in a small in-memory LRU in front of a SQLite file, so repeat
+    lookups within a run never leave the process and repeat scans across runs
+    never touch the network. Each endpoint gets its own time-to-live, looked up
+    by the longest matching path prefix in `ttls`. Both tiers are size bounded
+    and evict the least recently used entries first.
+    """
+    DEFAULT_TTLS = {
+        '/database/search': 24 * 60 * 60,
+        '/releases/': 30 * 24 * 60 * 60,
+        '/masters/': 30 * 24 * 60 * 60,
+        '/artists/': 7 * 24 * 60 * 60,
+        '/labels/': 7 * 24 * 60 * 60,
+    }
+
+    def __init__(self, path=None, ttls=None, default_ttl=24 * 60 * 60,
+                 max_memory_entries=512, max_disk_entries=20000):
+        self.path = path
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, content BLOB NOT NULL, '
+                'expires REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            self._db.commit()
+            self._disk_entries = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def key_for(method, url):
+        return '{0} {1}'.format(method.upper(), url)
+
+    def ttl_for(self, url):
+        """Returns the TTL in seconds for the endpoint `url` points at."""
+        path = urlsplit(url).path
+        best, best_len = self.default_ttl, -1
+        for prefix, ttl in self.ttls.items():
+            if path.startswith(prefix) and len(prefix) > best_len:
+                best, best_len = ttl, len(prefix)
+        return best
+
+    def get(self, method, url):
+        """Returns the cached response body for method + url, or None."""
+        key = self.key_for(method, url)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                content, expires = entry
+                if expires > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return content
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT content, expires FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None:
+                    content, expires = row
+                    if expires > now:
+                        self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                        self._db.commit()
+                        self._remember(key, content, expires)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return content
+                    self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self._db.commit()
+                    self._disk_entries -= 1
+
+            self.misses += 1
+            return None
+
+    def set(self, method, url, content):
+        """Stores a response body for method + url under its endpoint's TTL."""
+        key = self.key_for(method, url)
+        ttl = self.ttl_for(url)
+        if ttl <= 0:
+            return
+        now = time.time()
+        expires = now + ttl
+        with self._lock:
+            self._remember(key, content, expires)
+            if self._db is not None:
+                existed = self._db.execute(
+                    'SELECT 1 FROM responses WHERE key = ?', (key,)
+                ).fetchone() is not None
+                self._db.execute(
+                    'INSERT OR REPLACE INTO responses (key, content, expires, accessed) VALUES (?, ?, ?, ?)',
+                    (key, sqlite3.Binary(content), expires, now)
+                )
+                if not existed:
+                    self._disk_entries += 1
+                self._evict_disk()
+                self._db.commit()
+
+    def _remember(self, key, content, expires):
+        self._memory[key] = (bytes(content), expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        overflow = self._disk_entries - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY accessed LIMIT ?)',
+                (overflow,)
+            )
+            self._disk_entries -= overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM responses')
+                self._db.commit()
+                self._disk_entries = 0
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'disk_entries': self._disk_entries if self._db is not None else 0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
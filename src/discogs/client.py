@@ -1,37 +1,115 @@
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import discogs.model as models
+from discogs.cache import ResponseCache
+from discogs.local_index import LocalIndex
+from discogs.ratelimit import RateLimiter
 from discogs.utils import update_qs
 
 
 class RequestsFetcher:
-    """Fetches via HTTP from the Discogs API."""
+    """
+    Fetches via HTTP from the Discogs API.
+
+    A single requests.Session is kept per fetcher so that consecutive calls
+    reuse warm keep-alive connections instead of paying a new TCP+TLS handshake
+    to api.discogs.com on every lookup. Only connection-level failures are
+    retried here; status-based retries are left to the Client so they can be
+    paced by its RateLimiter.
+    """
+    def __init__(self, pool_size=10, max_retries=3, backoff_factor=0.5, timeout=10):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retries = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=0,
+            backoff_factor=backoff_factor,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retries,
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
     def fetch(self, client, method, url, data=None, headers=None, json=True):
-        resp = requests.request(method, url, data=data, headers=headers)
-        return resp.content, resp.status_code
+        resp = self.session.request(method, url, data=data, headers=headers, timeout=self.timeout)
+        return resp.content, resp.status_code, resp.headers
+
+    def close(self):
+        self.session.close()
 
 
 class Client:
+    RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
     BASE_URL = "https://api.discogs.com"
     _base_url = 'https://api.discogs.com'
-    _fetcher = RequestsFetcher()
 
-    def __init__(self, token: str, user_agent: str = "VinylVision/1.0"):
+    def __init__(self, token: str, user_agent: str = "VinylVision/1.0", pool_size: int = 10,
+                 max_retries: int = 3, timeout: float = 10, cache: ResponseCache = None,
+                 rate_limiter: RateLimiter = None, local_index: LocalIndex = None):
         self.headers = {
             "Authorization": f"Discogs token={token}",
             "User-Agent": user_agent
         }
+        self._fetcher = RequestsFetcher(pool_size=pool_size, max_retries=max_retries, timeout=timeout)
+        self.cache = cache
+        self.max_retries = max_retries
+        # Pass the same RateLimiter to every Client sharing a token
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.local_index = local_index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release the pooled connections held by this client."""
+        self._fetcher.close()
 
     def _get(self, url):
         return self._request('GET', url)
-    
+
     def _request(self, method, url, data=None):
-        content, status_code = self._fetcher.fetch(self, method, url, data=data, headers=self.headers)
+        cacheable = self.cache is not None and method == 'GET'
+        if cacheable:
+            content = self.cache.get(method, url)
+            if content is not None:
+                return json.loads(content.decode('utf8'))
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            content, status_code, headers = self._fetcher.fetch(self, method, url, data=data, headers=self.headers)
+            self.rate_limiter.update(headers)
+            if status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                break
+            time.sleep(self.rate_limiter.backoff(attempt, headers.get('Retry-After')))
+
+        if cacheable and status_code == 200:
+            self.cache.set(method, url, content)
 
+        return self._decode(content, status_code)
+
+    @staticmethod
+    def _decode(content, status_code):
         if status_code == 204:
             return None
 
-        body = json.loads(content.decode('utf8'))
+        try:
+            body = json.loads(content.decode('utf8'))
+        except ValueError:
+            raise RuntimeError(content.decode('utf8', 'replace'), status_code)
 
         if 200 <= status_code < 300:
             return body
@@ -43,7 +121,41 @@ class Client:
         Search the Discogs database. Returns a paginated list of objects
         (Artists, Releases, Masters, and Labels). The keyword arguments to this
         function are serialized into the request's query string.
+
+        With a local_index, plain text searches for releases or masters are
+        answered from it, as a list of fully loaded objects, when it has hits
+        containing every word of the query (see LocalIndex.search); anything
+        else, including searches the index can't answer confidently, goes to
+        the API.
+        """
+        url = self._search_url(query, fields)
+        if self.local_index is not None and 'q' in fields and set(fields) <= {'q', 'type'}:
+            results = self.local_index.search(self, fields['q'], type=fields.get('type', 'release'))
+            if results:
+                return results
+        return models.MixedPaginatedList(self, url, 'results')
+
+    def hydrate(self, objects, fields=None, max_workers=8):
+        """
+        Fully loads a batch of PrimaryAPIObjects (e.g. search results) in
+        parallel, instead of one blocking refresh per object on first access.
+
+        Objects sharing a resource_url are fetched once. If `fields` is given,
+        objects that already hold all of those keys are left alone. Hydrated
+        objects are marked as loaded, so later fetch() calls for keys the
+        resource doesn't have return the default without a network call.
         """
+        by_url = _pending_refreshes(objects, fields)
+        if by_url:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(by_url))) as executor:
+                results = executor.map(self._get, list(by_url))
+                for same_resource, data in zip(by_url.values(), results):
+                    for obj in same_resource:
+                        obj._apply_refresh(data)
+        return objects
+
+    @classmethod
+    def _search_url(cls, query, fields):
         if query:
             unicode_query = []
             for q in query:
@@ -53,8 +165,17 @@ class Client:
                     unicode_q = q
                 unicode_query.append(unicode_q)
             fields['q'] = ' '.join(unicode_query)
-        return models.MixedPaginatedList(
-            self,
-            update_qs(self.BASE_URL + '/database/search', fields),
-            'results'
-        )
+        return update_qs(cls.BASE_URL + '/database/search', fields)
+
+
+def _pending_refreshes(objects, fields=None):
+    """Groups the objects that still need loading by their resource_url."""
+    by_url = {}
+    for obj in objects:
+        url = obj.data.get('resource_url')
+        if not url or obj._loaded:
+            continue
+        if fields is not None and all(field in obj.data for field in fields):
+            continue
+        by_url.setdefault(url, []).append(obj)
+    return by_url
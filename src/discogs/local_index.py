@@ -0,0 +1,251 @@
+import gzip
+import json
+import re
+import sqlite3
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+from typing import Iterator, List
+import discogs.model as models
+
+
+class LocalIndex:
+    """
+    An offline copy of Discogs releases and masters, built from the monthly
+    XML data dumps (https://data.discogs.com/).
+
+    Dumps are streamed element by element, so importing takes constant memory
+    however large the file is. Each object is stored as zlib-compressed JSON
+    shaped like the matching API response, next to an FTS5 full-text index
+    over title, artists and labels. search() returns regular discogs.model
+    objects marked as fully loaded, so reading their fields never goes to the
+    network. One connection is shared by every thread using the index (the
+    service's identify and lookup workers), so each query holds a lock.
+    """
+    TYPES = ('release', 'master')
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        for type_ in self.TYPES:
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {type_}s (id INTEGER PRIMARY KEY, data BLOB NOT NULL)'
+            )
+            self._db.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {type_}_fts '
+                f'USING fts5(title, artists, labels)'
+            )
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def import_releases(self, dump_path: str, batch_size: int = 1000) -> int:
+        """Imports a discogs_*_releases.xml(.gz) dump. Returns the number of releases."""
+        return self._import('release', _parse_release, dump_path, batch_size)
+
+    def import_masters(self, dump_path: str, batch_size: int = 1000) -> int:
+        """Imports a discogs_*_masters.xml(.gz) dump. Returns the number of masters."""
+        return self._import('master', _parse_master, dump_path, batch_size)
+
+    def _import(self, type_, parse, dump_path, batch_size):
+        count = 0
+        rows, fts_rows = [], []
+        for elem in _iter_elements(dump_path, type_):
+            item = parse(elem)
+            rows.append((item['id'], zlib.compress(json.dumps(item, separators=(',', ':')).encode('utf8'))))
+            fts_rows.append((
+                item['id'],
+                item.get('title', ''),
+                ' '.join(artist['name'] for artist in item.get('artists', [])),
+                ' '.join(label['name'] for label in item.get('labels', [])),
+            ))
+            if len(rows) >= batch_size:
+                count += self._write(type_, rows, fts_rows)
+                rows, fts_rows = [], []
+        if rows:
+            count += self._write(type_, rows, fts_rows)
+        return count
+
+    def _write(self, type_, rows, fts_rows):
+        ids = [(row[0],) for row in rows]
+        with self._lock:
+            # FTS rows can't be upserted, so re-imports delete first
+            self._db.executemany(f'DELETE FROM {type_}_fts WHERE rowid = ?', ids)
+            self._db.executemany(f'INSERT OR REPLACE INTO {type_}s (id, data) VALUES (?, ?)', rows)
+            self._db.executemany(
+                f'INSERT INTO {type_}_fts (rowid, title, artists, labels) VALUES (?, ?, ?, ?)', fts_rows
+            )
+            self._db.commit()
+        return len(rows)
+
+    def get(self, client, type_: str, id_: int):
+        """Returns the stored object of `type_` with `id_`, or None."""
+        with self._lock:
+            row = self._db.execute(f'SELECT data FROM {type_}s WHERE id = ?', (id_,)).fetchone()
+        if row is None:
+            return None
+        return self._to_object(client, type_, row[0])
+
+    def search(self, client, query: str, type: str = 'release', limit: int = 50, match_all: bool = True,
+               min_title_coverage: float = 0.6) -> List:
+        """
+        Full-text search over title, artists and labels, best matches first;
+        titles weigh most in the ranking.
+
+        By default every word of the query must appear somewhere in a hit, and
+        the query must cover at least `min_title_coverage` of the hit's title
+        words, so a lone "the" doesn't find "The Wall". With match_all=False
+        any word may match and nothing is filtered, for callers that score the
+        candidates themselves (e.g. against noisy OCR text).
+        """
+        if type not in self.TYPES:
+            return []
+        terms = re.findall(r'\w+', query.lower())
+        if not terms:
+            return []
+        match = (' AND ' if match_all else ' OR ').join('"{0}"'.format(term) for term in terms)
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT d.data FROM {type}_fts f JOIN {type}s d ON d.id = f.rowid '
+                f'WHERE {type}_fts MATCH ? ORDER BY bm25({type}_fts, 10.0, 3.0, 1.0) LIMIT ?',
+                (match, limit)
+            ).fetchall()
+        objects = [self._to_object(client, type, row[0]) for row in rows]
+        if match_all:
+            query_terms = set(terms)
+            objects = [obj for obj in objects if _title_coverage(query_terms, obj.data) >= min_title_coverage]
+        return objects
+
+    @staticmethod
+    def _to_object(client, type_, blob):
+        obj = models.CLASS_MAP[type_](client, json.loads(zlib.decompress(blob)))
+        obj._loaded = True
+        return obj
+
+
+def _title_coverage(query_terms, data):
+    """Share of the title's words that appear in the query."""
+    title_terms = re.findall(r'\w+', (data.get('title') or '').lower())
+    if not title_terms:
+        return 0.0
+    return sum(term in query_terms for term in title_terms) / len(title_terms)
+
+
+def _iter_elements(dump_path: str, tag: str) -> Iterator[ET.Element]:
+    opener = gzip.open if dump_path.endswith('.gz') else open
+    with opener(dump_path, 'rb') as dump:
+        context = ET.iterparse(dump, events=('start', 'end'))
+        _, root = next(context)
+        depth = 0
+        for event, elem in context:
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0 and elem.tag == tag:
+                yield elem
+                # Drop everything parsed so far to keep memory flat
+                root.clear()
+
+
+def _text(elem, path, default=None):
+    found = elem.find(path)
+    if found is None or found.text is None:
+        return default
+    return found.text.strip()
+
+
+def _texts(elem, path):
+    return [child.text.strip() for child in elem.findall(path) if child.text]
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_artists(elem, path):
+    return [
+        {
+            'id': _int(_text(artist, 'id')),
+            'name': _text(artist, 'name', ''),
+            'anv': _text(artist, 'anv', ''),
+            'join': _text(artist, 'join', ''),
+            'role': _text(artist, 'role', ''),
+        }
+        for artist in elem.findall(path)
+    ]
+
+
+def _parse_release(elem):
+    released = _text(elem, 'released', '')
+    master = elem.find('master_id')
+    return {
+        'id': int(elem.get('id')),
+        'status': elem.get('status'),
+        'title': _text(elem, 'title', ''),
+        'artists': _parse_artists(elem, 'artists/artist'),
+        'extraartists': _parse_artists(elem, 'extraartists/artist'),
+        'labels': [
+            {'id': _int(label.get('id')), 'name': label.get('name', ''), 'catno': label.get('catno', '')}
+            for label in elem.findall('labels/label')
+        ],
+        'companies': [
+            {'id': _int(_text(company, 'id')), 'name': _text(company, 'name', ''),
+             'entity_type_name': _text(company, 'entity_type_name', '')}
+            for company in elem.findall('companies/company')
+        ],
+        'formats': [
+            {'name': fmt.get('name'), 'qty': fmt.get('qty'), 'text': fmt.get('text', ''),
+             'descriptions': _texts(fmt, 'descriptions/description')}
+            for fmt in elem.findall('formats/format')
+        ],
+        'genres': _texts(elem, 'genres/genre'),
+        'styles': _texts(elem, 'styles/style'),
+        'country': _text(elem, 'country'),
+        'released': released,
+        'year': _int(released[:4]),
+        'notes': _text(elem, 'notes'),
+        'data_quality': _text(elem, 'data_quality'),
+        'master_id': _int(master.text) if master is not None else None,
+        'tracklist': [
+            {'position': _text(track, 'position', ''), 'title': _text(track, 'title', ''),
+             'duration': _text(track, 'duration', ''), 'type_': 'track'}
+            for track in elem.findall('tracklist/track')
+        ],
+    }
+
+
+def _parse_master(elem):
+    return {
+        'id': int(elem.get('id')),
+        'main_release': _int(_text(elem, 'main_release')),
+        'title': _text(elem, 'title', ''),
+        'year': _int(_text(elem, 'year')),
+        'artists': _parse_artists(elem, 'artists/artist'),
+        'genres': _texts(elem, 'genres/genre'),
+        'styles': _texts(elem, 'styles/style'),
+        'data_quality': _text(elem, 'data_quality'),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import Discogs XML dumps into a local index.")
+    parser.add_argument("index", help="path of the SQLite index to create or update")
+    parser.add_argument("--releases", help="discogs_*_releases.xml(.gz) dump")
+    parser.add_argument("--masters", help="discogs_*_masters.xml(.gz) dump")
+    args = parser.parse_args()
+
+    index = LocalIndex(args.index)
+    if args.releases:
+        print(f"imported {index.import_releases(args.releases)} releases")
+    if args.masters:
+        print(f"imported {index.import_masters(args.masters)} masters")
+    index.close()
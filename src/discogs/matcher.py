@@ -0,0 +1,118 @@
+import re
+from typing import Iterable, List, NamedTuple, Optional
+import numpy as np
+
+TRIGRAM_DIM = 4096
+
+# Bonus/penalty applied when a side hint can be checked against a candidate
+SIDE_MATCH_BONUS = 0.05
+SIDE_MISMATCH_PENALTY = 0.1
+TRACK_WEIGHT = 0.3
+
+
+class Match(NamedTuple):
+    release: object
+    confidence: float
+
+
+def normalize(text: str) -> str:
+    return ' '.join(re.findall(r'\w+', (text or '').lower()))
+
+
+def trigram_vectors(texts: List[str]) -> np.ndarray:
+    """
+    Hashes each text's character trigrams into a row of an L2-normalized
+    (len(texts), TRIGRAM_DIM) count matrix, so cosine similarity between a
+    query and a whole page of candidates is a single matrix product.
+    """
+    vectors = np.zeros((len(texts), TRIGRAM_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        codes = np.frombuffer(f'  {normalize(text)} '.encode('utf8'), dtype=np.uint8).astype(np.int64)
+        if len(codes) < 3:
+            continue
+        trigrams = (codes[:-2] << 16) | (codes[1:-1] << 8) | codes[2:]
+        buckets = ((trigrams * 2654435761) >> 20) % TRIGRAM_DIM
+        vectors[row] = np.bincount(buckets, minlength=TRIGRAM_DIM)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def token_set_scores(query: str, texts: List[str]) -> np.ndarray:
+    """Jaccard overlap between the query's words and each text's, ignoring word order."""
+    query_tokens = set(normalize(query).split())
+    if not query_tokens:
+        return np.zeros(len(texts), dtype=np.float32)
+    scores = np.zeros(len(texts), dtype=np.float32)
+    for i, text in enumerate(texts):
+        tokens = set(normalize(text).split())
+        scores[i] = len(query_tokens & tokens) / len(query_tokens | tokens)
+    return scores
+
+
+def similarity(query: str, texts: List[str]) -> np.ndarray:
+    """Scores every text against query in [0, 1]."""
+    if not texts:
+        return np.zeros(0, dtype=np.float32)
+    trigram = trigram_vectors(texts) @ trigram_vectors([query])[0]
+    return np.maximum(trigram, token_set_scores(query, texts))
+
+
+def _titles(release) -> List[str]:
+    # Search results are titled "Artist - Title"; score against both forms
+    title = release.data.get('title') or ''
+    _, _, bare = title.partition(' - ')
+    return [title, bare or title]
+
+
+def _side_hint(release, side) -> Optional[bool]:
+    """Whether `side` appears on the release, or None when that can't be told offline."""
+    if release.data.get('tracklist'):
+        return release.side_map.resolve(side) is not None
+    formats = release.data.get('format') or [fmt.get('name') for fmt in release.data.get('formats', [])]
+    return True if 'Vinyl' in formats else None
+
+
+def rank_releases(candidates: Iterable, album_name: str, side=None, track_hints: List[str] = None) -> List[Match]:
+    """
+    Ranks candidate releases (e.g. one page of search results) against the
+    album name extracted from a label, best first.
+
+    Titles are scored with trigram cosine and token-set overlap over the
+    whole page at once. Side and track hints are only checked against data the
+    candidates already hold, so ranking never triggers a network refresh.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+
+    titles = [_titles(release) for release in candidates]
+    scores = similarity(album_name, [title for pair in titles for title in pair])
+    confidence = scores.reshape(len(candidates), 2).max(axis=1)
+
+    if track_hints:
+        with_tracks = [i for i, release in enumerate(candidates) if release.data.get('tracklist')]
+        track_texts = [
+            ' '.join(track.get('title', '') for track in candidates[i].data['tracklist'])
+            for i in with_tracks
+        ]
+        track_scores = similarity(' '.join(track_hints), track_texts)
+        confidence[with_tracks] = (1 - TRACK_WEIGHT) * confidence[with_tracks] + TRACK_WEIGHT * track_scores
+
+    if side is not None:
+        for i, release in enumerate(candidates):
+            hint = _side_hint(release, side)
+            if hint is True:
+                confidence[i] += SIDE_MATCH_BONUS
+            elif hint is False:
+                confidence[i] -= SIDE_MISMATCH_PENALTY
+
+    confidence = np.clip(confidence, 0.0, 1.0)
+    # Stable sort keeps the API's own ordering between equal scores
+    order = np.argsort(-confidence, kind='stable')
+    return [Match(candidates[i], float(confidence[i])) for i in order]
+
+
+def best_match(candidates: Iterable, album_name: str, side=None, track_hints: List[str] = None) -> Optional[Match]:
+    ranked = rank_releases(candidates, album_name, side=side, track_hints=track_hints)
+    return ranked[0] if ranked else None
@@ -1 +1,3 @@
-from .models import *
\ No newline at end of file
+from .models import *
+from .sides import SideMap
+from .positions import TrackPosition, TracklistArrays, parse_releases, parse_tracklist
\ No newline at end of file
@@ -1,6 +1,10 @@
+import inspect
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from discogs_client.exceptions import HTTPError
+from discogs.model.positions import TrackPosition, parse_duration, parse_position
+from discogs.model.sides import SideMap
 from discogs.utils import update_qs
 
 
@@ -32,6 +36,8 @@ class SimpleFieldDescriptor(object):
 
     def __set__(self, instance, value):
         if self.writable:
+            if instance.changes is None:
+                instance.changes = {}
             instance.changes[self.name] = value
             return
         raise AttributeError("can't set attribute")
@@ -63,6 +69,9 @@ class ObjectFieldDescriptor(object):
     def __get__(self, instance, owner):
         if instance is None:
             return self
+        return _memoized(instance, self.name, self._build)
+
+    def _build(self, instance):
         wrapper_class = CLASS_MAP[self.class_name.lower()]
         response_dict = instance.fetch(self.name)
         if self.optional and not response_dict:
@@ -79,13 +88,18 @@ class ObjectFieldDescriptor(object):
 class ListFieldDescriptor(object):
     """
     An attribute that determines its value using the object's fetch() method,
-    and passes each item in the resulting list through an APIObject.
+    and passes each item in the resulting list through an APIObject, returning
+    a tuple of them.
 
     Shorthand for:
 
         @property
         def bar(self):
-            return [BarClass(self.client, d) for d in self.fetch('bar', [])]
+            return tuple(BarClass(self.client, d) for d in self.fetch('bar', []))
+
+    The tuple is built once per instance and reused on later reads, until the
+    object is refreshed. It is immutable so a caller can't change what later
+    reads see.
     """
     def __init__(self, name, class_name):
         self.name = name
@@ -94,8 +108,11 @@ class ListFieldDescriptor(object):
     def __get__(self, instance, owner):
         if instance is None:
             return self
+        return _memoized(instance, self.name, self._build)
+
+    def _build(self, instance):
         wrapper_class = CLASS_MAP[self.class_name.lower()]
-        return [wrapper_class(instance.client, d) for d in instance.fetch(self.name, [])]
+        return tuple(wrapper_class(instance.client, d) for d in instance.fetch(self.name, []))
 
     def __set__(self, instance, value):
         raise AttributeError("can't set attribute")
@@ -128,6 +145,9 @@ class ObjectCollectionDescriptor(object):
     def __get__(self, instance, owner):
         if instance is None:
             return self
+        return _memoized(instance, self.name, self._build)
+
+    def _build(self, instance):
         wrapper_class = CLASS_MAP[self.class_name.lower()]
         return self.list_class(instance.client, instance.fetch(self.url_key), self.name, wrapper_class)
 
@@ -135,6 +155,19 @@ class ObjectCollectionDescriptor(object):
         raise AttributeError("can't set attribute")
 
 
+def _memoized(instance, name, build):
+    """Returns instance's cached value for a field, building it on first read."""
+    memo = instance._memo
+    if memo is not None and name in memo:
+        return memo[name]
+    value = build(instance)
+    # build() may have refreshed the object, which resets the memo
+    if instance._memo is None:
+        instance._memo = {}
+    instance._memo[name] = value
+    return value
+
+
 class Field(object):
     """
     A placeholder for a descriptor. Is transformed into a descriptor by the
@@ -157,7 +190,7 @@ class SimpleField(Field):
 
 
 class ListField(Field):
-    """A field that returns a list of APIObjects."""
+    """A field that returns a tuple of APIObjects."""
     _descriptor_class = ListFieldDescriptor
 
 
@@ -191,8 +224,13 @@ class PrimaryAPIObject(APIObject):
     def __init__(self, client, dict_):
         self.data = dict_
         self.client = client
-        self._known_invalid_keys = []
-        self.changes = {}
+        # changes, _known_invalid_keys and _memo are only allocated when used
+        self.changes = None
+        self._known_invalid_keys = None
+        # True once the full resource has been loaded, after which a missing
+        # key is known to be absent rather than not yet fetched
+        self._loaded = False
+        self._memo = None
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -206,13 +244,27 @@ class PrimaryAPIObject(APIObject):
     def refresh(self):
         if self.data.get('resource_url'):
             data = self.client._get(self.data['resource_url'])
-            self.data.update(data)
-            self.changes = {}
+            if inspect.iscoroutine(data):
+                data.close()
+                raise RuntimeError(
+                    "objects from an AsyncClient must be loaded with 'await obj.refresh_async()'"
+                )
+            self._apply_refresh(data)
+
+    async def refresh_async(self):
+        if self.data.get('resource_url'):
+            self._apply_refresh(await self.client._get(self.data['resource_url']))
+
+    def _apply_refresh(self, data):
+        self.data.update(data)
+        self.changes = None
+        self._loaded = True
+        self._memo = None
 
     def save(self):
         if self.data.get('resource_url'):
             # TODO: This should be PATCH
-            self.client._post(self.data['resource_url'], self.changes)
+            self.client._post(self.data['resource_url'], self.changes or {})
 
             # Refresh the object, in case there were side-effects
             self.refresh()
@@ -222,14 +274,12 @@ class PrimaryAPIObject(APIObject):
             self.client._delete(self.data['resource_url'])
 
     def fetch(self, key, default=None):
-        if key in self._known_invalid_keys:
+        if self._known_invalid_keys is not None and key in self._known_invalid_keys:
             return default
 
-        try:
-            # First, look in the cache of pending changes
+        # First, look in the cache of pending changes
+        if self.changes is not None and key in self.changes:
             return self.changes[key]
-        except KeyError:
-            pass
 
         try:
             # Next, look in the potentially incomplete local cache
@@ -237,6 +287,11 @@ class PrimaryAPIObject(APIObject):
         except KeyError:
             pass
 
+        if self._loaded:
+            # The full resource is already here, so the key doesn't exist
+            self._mark_invalid(key)
+            return default
+
         # Now refresh the object from its resource_url.
         # The key might exist but not be in our cache.
         self.refresh()
@@ -244,9 +299,14 @@ class PrimaryAPIObject(APIObject):
         try:
             return self.data[key]
         except:
-            self._known_invalid_keys.append(key)
+            self._mark_invalid(key)
             return default
 
+    def _mark_invalid(self, key):
+        if self._known_invalid_keys is None:
+            self._known_invalid_keys = set()
+        self._known_invalid_keys.add(key)
+
 
 # This is terribly cheesy, but makes the client API more consistent
 class SecondaryAPIObject(APIObject):
@@ -257,24 +317,38 @@ class SecondaryAPIObject(APIObject):
     def __init__(self, client, dict_):
         self.client = client
         self.data = dict_
+        self._memo = None
 
     def fetch(self, key, default=None):
         return self.data.get(key, default)
 
 
 class BasePaginatedResponse(object):
-    """Base class for lists of objects spread across many URLs."""
-    def __init__(self, client, url):
+    """
+    Base class for lists of objects spread across many URLs.
+
+    Iterating over the whole list reads ahead: while one page is being
+    consumed, up to `prefetch` following pages are fetched in the background.
+    Set `prefetch` to 0 to load pages strictly one at a time. Unless
+    `per_page` was set explicitly, a full iteration that starts with nothing
+    loaded asks for MAX_PER_PAGE items per page to save round-trips.
+    """
+    MAX_PER_PAGE = 100
+
+    def __init__(self, client, url, prefetch=4):
         self.client = client
         self.url = url
         self._num_pages = None
         self._num_items = None
         self._pages = {}
         self._per_page = 50
+        # Whether the caller chose per_page, which iteration must then respect
+        self._per_page_set = False
         self._list_key = 'items'
         self._sort_key = None
         self._sort_order = 'asc'
         self._filters = {}
+        self.prefetch = prefetch
 
     @property
     def per_page(self):
@@ -283,6 +357,7 @@ class BasePaginatedResponse(object):
     @per_page.setter
     def per_page(self, value):
         self._per_page = value
+        self._per_page_set = True
         self._invalidate()
 
     def _invalidate(self):
@@ -292,9 +367,7 @@ class BasePaginatedResponse(object):
 
     def _load_pagination_info(self):
         data = self.client._get(self._url_for_page(1))
-        self._pages[1] = [
-            self._transform(item) for item in data[self._list_key]
-        ]
+        self._store_page(1, data)
         self._num_pages = data['pagination']['pages']
         self._num_items = data['pagination']['items']
 
@@ -341,12 +414,14 @@ class BasePaginatedResponse(object):
 
     def page(self, index):
         if index not in self._pages:
-            data = self.client._get(self._url_for_page(index))
-            self._pages[index] = [
-                self._transform(item) for item in data[self._list_key]
-            ]
+            self._store_page(index, self.client._get(self._url_for_page(index)))
         return self._pages[index]
 
+    def _store_page(self, index, data):
+        self._pages[index] = [
+            self._transform(item) for item in data[self._list_key]
+        ]
+
     def _transform(self, item):
         return item
 
@@ -367,11 +442,38 @@ class BasePaginatedResponse(object):
     def __len__(self):
         return self.count
 
+    def _widen_pages(self):
+        if not self._pages and not self._per_page_set and self._per_page < self.MAX_PER_PAGE:
+            # Nothing is loaded yet and we are reading everything, so make
+            # each round-trip count
+            self._per_page = self.MAX_PER_PAGE
+            self._invalidate()
+
     def __iter__(self):
-        for i in range(1, self.pages + 1):
-            page = self.page(i)
-            for item in page:
-                yield item
+        self._widen_pages()
+
+        num_pages = self.pages
+        if self.prefetch < 1 or num_pages < 2:
+            for i in range(1, num_pages + 1):
+                for item in self.page(i):
+                    yield item
+            return
+
+        # Requests go through client._get, so the client's rate limiter still
+        # paces the read-ahead
+        executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        pending = {}
+        try:
+            for i in range(1, num_pages + 1):
+                for ahead in range(i + 1, min(i + self.prefetch, num_pages) + 1):
+                    if ahead not in self._pages and ahead not in pending:
+                        pending[ahead] = executor.submit(self.client._get, self._url_for_page(ahead))
+                if i in pending:
+                    self._store_page(i, pending.pop(i).result())
+                for item in self.page(i):
+                    yield item
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
 
 class PaginatedList(BasePaginatedResponse):
@@ -452,6 +554,11 @@ class Release(PrimaryAPIObject):
         super(Release, self).__init__(client, dict_)
         self.data['resource_url'] = '{0}/releases/{1}'.format(client._base_url, dict_['id'])
 
+    @property
+    def side_map(self) -> SideMap:
+        """The tracklist indexed by side and disc, built once per loaded tracklist."""
+        return _memoized(self, 'side_map', lambda release: SideMap(release.tracklist))
+
     @property
     def master(self):
         master_id = self.fetch('master_id')
@@ -515,18 +622,28 @@ class Track(SecondaryAPIObject):
 
     def __repr__(self):
         return self.repr_str('<Track {0!r} {1!r}>'.format(self.position, self.title))
-    
+
+    @property
+    def parsed_position(self) -> TrackPosition:
+        """Side, number, subtrack and disc of the position, parsed once per track."""
+        return _memoized(self, 'parsed_position', lambda track: parse_position(track.position))
+
+    @property
+    def seconds(self):
+        """The duration in seconds, or None when Discogs has none."""
+        return _memoized(self, 'seconds', lambda track: parse_duration(track.duration))
+
     def get_side(self):
-        if self.position:
-            # Assuming position is in the format "A1", "B2", etc.
-            return self.position[0]
-        return None
-    
+        return self.parsed_position.side
+
     def get_track_number(self):
-        if self.position:
-            # Assuming position is in the format "A1", "B2", etc.
-            return int(self.position[1:])
-        return None
+        return self.parsed_position.number
+
+    def get_subtrack(self):
+        return self.parsed_position.subtrack
+
+    def get_disc(self):
+        return self.parsed_position.disc
 
 
 CLASS_MAP = {
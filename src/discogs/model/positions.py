@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
+import numpy as np
+
+# Discogs positions as they appear in practice: "A1", "B12", "A1a", "A1.2",
+# "AA", "AA1", "C" (a whole side), disc-track pairs ("1-3", "CD2-4") and
+# plain CD track numbers ("7")
+POSITION_PATTERN = re.compile(
+    r'''^\s*
+    (?:(?:CD|DVD|BD|LP|MC|Disc\s*)?(?P<disc>\d+)\s*[-/]\s*)?
+    (?P<side>[A-Z]{1,2}(?=\d|\.|[a-z]|\s*$))?
+    (?P<number>\d+)?
+    (?:\.?(?P<subtrack>[a-z])|\.(?P<subindex>\d+))?
+    \s*$''',
+    re.VERBOSE,
+)
+# "m:ss" or "h:mm:ss": seconds, and minutes after hours, are exactly two digits below 60
+DURATION_PATTERN = re.compile(r'^\s*(?:(\d+):(?=[0-5]\d:))?(\d+):([0-5]\d)\s*$')
+
+
+class TrackPosition(NamedTuple):
+    # Vinyl/cassette side letter(s), None on CDs and digital releases
+    side: Optional[str]
+    number: Optional[int]
+    # "a" in "A1a", "2" in "A1.2"
+    subtrack: Optional[str]
+    # Disc number from "1-3"-style positions
+    disc: Optional[int]
+
+
+UNKNOWN_POSITION = TrackPosition(None, None, None, None)
+
+
+@lru_cache(maxsize=4096)
+def parse_position(position: Optional[str]) -> TrackPosition:
+    """Splits a Discogs track position into side, number, subtrack and disc."""
+    if not position:
+        return UNKNOWN_POSITION
+    match = POSITION_PATTERN.match(position)
+    if match is None or not any(match.groups()):
+        return UNKNOWN_POSITION
+    disc, side, number, subtrack, subindex = match.groups()
+    return TrackPosition(
+        side,
+        int(number) if number is not None else None,
+        subtrack or subindex,
+        int(disc) if disc is not None else None,
+    )
+
+
+@lru_cache(maxsize=4096)
+def parse_duration(duration: Optional[str]) -> Optional[int]:
+    """Seconds in a "m:ss" or "h:mm:ss" duration, or None when it is blank or malformed."""
+    if not duration:
+        return None
+    match = DURATION_PATTERN.match(duration)
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+class TracklistArrays(NamedTuple):
+    """Parsed fields of many tracks as parallel arrays, one row per track."""
+    sides: np.ndarray       # object, None where there is no side
+    numbers: np.ndarray     # int32, -1 where there is no number
+    subtracks: np.ndarray   # object
+    discs: np.ndarray       # int32, -1 where there is no disc
+    seconds: np.ndarray     # float64, NaN where the duration is unknown
+    # Which release each row came from, for batches built by parse_releases
+    release_index: np.ndarray
+
+
+def _data(track):
+    return getattr(track, 'data', track)
+
+
+def parse_tracklist(tracks: Iterable, release_index: np.ndarray = None) -> TracklistArrays:
+    """
+    Parses a whole tracklist (Track objects or raw track dicts) at once.
+
+    Positions and durations repeat heavily across tracklists ("A1", "3:45"),
+    so each distinct string is parsed once and the results are scattered
+    back with NumPy fancy indexing.
+    """
+    tracks = [_data(track) for track in tracks]
+    positions = np.array([track.get('position') or '' for track in tracks], dtype=object)
+    durations = np.array([track.get('duration') or '' for track in tracks], dtype=object)
+
+    unique_positions, position_rows = np.unique(positions, return_inverse=True)
+    parsed = [parse_position(position) for position in unique_positions]
+    sides = np.array([p.side for p in parsed], dtype=object)
+    subtracks = np.array([p.subtrack for p in parsed], dtype=object)
+    numbers = np.array([-1 if p.number is None else p.number for p in parsed], dtype=np.int32)
+    discs = np.array([-1 if p.disc is None else p.disc for p in parsed], dtype=np.int32)
+
+    unique_durations, duration_rows = np.unique(durations, return_inverse=True)
+    seconds = np.array([parse_duration(duration) for duration in unique_durations], dtype=np.float64)
+
+    if release_index is None:
+        release_index = np.zeros(len(tracks), dtype=np.int32)
+    return TracklistArrays(
+        sides[position_rows], numbers[position_rows], subtracks[position_rows], discs[position_rows],
+        seconds[duration_rows], release_index,
+    )
+
+
+def parse_releases(releases: Iterable) -> TracklistArrays:
+    """parse_tracklist over a batch of releases, with release_index mapping rows back."""
+    tracks: List = []
+    counts = []
+    for release in releases:
+        tracklist = _data(release).get('tracklist') or []
+        tracks.extend(tracklist)
+        counts.append(len(tracklist))
+    release_index = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+    return parse_tracklist(tracks, release_index)
@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, List, Optional, Union
+
+
+class SideMap:
+    """
+    A release's tracklist arranged for lookups by side, built once: side
+    letter -> tracks in order, disc -> sides, side letter <-> side number,
+    and position -> track, all as dicts.
+
+    Side numbers follow the letters ("A" is 1, "C" is 3) so a label reading
+    "side 3" resolves to "C" whichever sides the tracklist lists; sides that
+    aren't single letters ("AA") are numbered after the whole single-letter
+    range (27, 28, ...) in order of appearance, so they never take the
+    number of a lettered side. On releases without sides, such as CDs,
+    resolve() returns None.
+    Vinyl discs are taken to hold consecutive pairs of sides (A/B, C/D, ...);
+    tracks with explicit "1-3"-style disc numbers, such as CDs, are grouped
+    under disc_tracks instead.
+    """
+
+    SINGLE_LETTER_SIDES = 26
+
+    def __init__(self, tracks: Iterable):
+        self.sides: Dict[str, List] = {}
+        self.disc_tracks: Dict[int, List] = {}
+        self._by_position = {}
+        for track in tracks:
+            if track.position:
+                self._by_position[track.position] = track
+            side = track.get_side()
+            if side is not None:
+                self.sides.setdefault(side, []).append(track)
+            elif track.get_disc() is not None:
+                self.disc_tracks.setdefault(track.get_disc(), []).append(track)
+
+        self.side_order: List[str] = list(self.sides)
+        self._number_of: Dict[str, int] = {}
+        multi_letter = 0
+        for side in self.side_order:
+            if len(side) == 1:
+                self._number_of[side] = ord(side) - ord('A') + 1
+            else:
+                multi_letter += 1
+                self._number_of[side] = self.SINGLE_LETTER_SIDES + multi_letter
+        self._letter_of: Dict[int, str] = {number: side for side, number in self._number_of.items()}
+
+        self.discs: Dict[int, List[str]] = {}
+        self._disc_of: Dict[str, int] = {}
+        for i, side in enumerate(self.side_order):
+            disc = i // 2 + 1
+            self.discs.setdefault(disc, []).append(side)
+            self._disc_of[side] = disc
+
+    def __contains__(self, side: str) -> bool:
+        return side in self.sides
+
+    def __len__(self):
+        return len(self.sides)
+
+    def resolve(self, side: Union[int, str, None]) -> Optional[str]:
+        """The letter of a side given as a number (3, "3") or letter ("c"), if the release has it."""
+        if side is None:
+            return None
+        if isinstance(side, str):
+            side = side.strip().upper()
+            if not side.isdigit():
+                return side if side in self.sides else None
+        return self._letter_of.get(int(side))
+
+    def number(self, side: str) -> Optional[int]:
+        return self._number_of.get(side)
+
+    def tracks_on(self, side: Union[int, str]) -> List:
+        """Tracks on a side, by letter or number, in tracklist order."""
+        return self.sides.get(self.resolve(side), [])
+
+    def disc_of(self, side: Union[int, str]) -> Optional[int]:
+        return self._disc_of.get(self.resolve(side))
+
+    def sides_on(self, disc: int) -> List[str]:
+        return self.discs.get(disc, [])
+
+    def track(self, position: str):
+        """The track at `position` ("B3"), or None."""
+        return self._by_position.get(position)
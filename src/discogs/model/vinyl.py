@@ -1,42 +1,157 @@
-from typing import List
-from src.discogs.model.models import Track
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional, Union
+import numpy as np
+from discogs.model.models import Track
+from discogs.model.positions import parse_duration
+from discogs.model.sides import SideMap
+
+
+class NeedlePosition(NamedTuple):
+    side: str
+    # Index of the track within its side, and its position string ("A2")
+    track_index: int
+    position: str
+    # Seconds into the track, and into the side
+    offset: float
+    elapsed: float
+    # Inches from the spindle
+    radius: float
+
+
+class SideIndex:
+    """
+    Precomputed geometry of one side: where each track starts in time,
+    revolutions and groove radius, held in NumPy arrays so a position can be
+    looked up by radius or elapsed time with a binary search. The array
+    methods take whole arrays of times or radii at once; locate() and seek()
+    answer single queries with plain float math, which is what a tracker
+    polling the tonearm many times a second needs.
+
+    The groove is modelled as a spiral of constant pitch filling the side
+    from R_OUTER to R_INNER, so radius falls linearly with revolutions.
+    """
+
+    def __init__(self, side: str, tracks: List[Track], rpm: float):
+        self.side = side
+        self.tracks = tracks
+        self.positions = [track.position for track in tracks]
+        self._index_of = {position: i for i, position in enumerate(self.positions)}
+        self.rps = rpm / 60
+        self.durations = np.array([track.seconds or 0 for track in tracks], dtype=np.float64)
+        self.ends = np.cumsum(self.durations)
+        self.starts = self.ends - self.durations
+        self.total_seconds = float(self.ends[-1]) if len(tracks) else 0.0
+        total_revolutions = self.total_seconds * self.rps
+        # Inches of radius consumed per revolution
+        self.pitch = Vinyl.R_GROOVE_RANGE / total_revolutions if total_revolutions else 0.0
+        self.start_revolutions = self.starts * self.rps
+        self.start_radii = Vinyl.R_OUTER - self.start_revolutions * self.pitch
+        # Scalar lookups bisect a plain list; NumPy's per-call overhead dominates for one value
+        self._starts = self.starts.tolist()
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def radius_at(self, elapsed: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Groove radius after `elapsed` seconds of the side."""
+        elapsed = np.clip(elapsed, 0.0, self.total_seconds)
+        return Vinyl.R_OUTER - elapsed * self.rps * self.pitch
+
+    def elapsed_at(self, radius: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Seconds into the side at which the needle reaches `radius`."""
+        if not self.pitch:
+            return np.zeros_like(radius, dtype=np.float64)
+        radius = np.clip(radius, Vinyl.R_INNER, Vinyl.R_OUTER)
+        return (Vinyl.R_OUTER - radius) / self.pitch / self.rps
+
+    def track_at(self, elapsed: Union[float, np.ndarray]) -> Union[int, np.ndarray]:
+        """Index of the track playing at `elapsed` seconds; accepts arrays of times."""
+        indices = np.searchsorted(self.starts, elapsed, side="right") - 1
+        return np.clip(indices, 0, max(len(self.tracks) - 1, 0))
+
+    def locate(self, elapsed: float = None, radius: float = None) -> NeedlePosition:
+        """Where the needle is, given either the elapsed time or the radius."""
+        if (elapsed is None) == (radius is None):
+            raise ValueError("pass exactly one of elapsed or radius")
+        if not self.tracks:
+            raise ValueError(f"side {self.side} has no tracks")
+        inches_per_second = self.pitch * self.rps
+        if elapsed is None:
+            radius = min(max(radius, Vinyl.R_INNER), Vinyl.R_OUTER)
+            elapsed = (Vinyl.R_OUTER - radius) / inches_per_second if inches_per_second else 0.0
+        elapsed = min(max(float(elapsed), 0.0), self.total_seconds)
+        i = max(bisect_right(self._starts, elapsed) - 1, 0)
+        return NeedlePosition(
+            self.side, i, self.positions[i], elapsed - self._starts[i], elapsed,
+            Vinyl.R_OUTER - elapsed * inches_per_second
+        )
+
+    def seek(self, position: str, offset: float = 0.0) -> NeedlePosition:
+        """The inverse lookup: elapsed time and radius of `offset` seconds into a track."""
+        i = self._index_of[position]
+        offset = min(max(float(offset), 0.0), float(self.durations[i]))
+        elapsed = self._starts[i] + offset
+        return NeedlePosition(self.side, i, position, offset, elapsed, Vinyl.R_OUTER - elapsed * self.rps * self.pitch)
+
 
 class Vinyl:
     R_OUTER = 5.75  # inches, start of grooves
     R_INNER = 2.5  # inches, end of grooves
     R_GROOVE_RANGE = R_OUTER - R_INNER  # inches, total usable groove space
+    RPM = 100 / 3
 
-    def __init__(self, tracks: List[Track], starting_side: str):
+    def __init__(self, tracks: List[Track], starting_side: Union[int, str], rpm: float = RPM,
+                 side_map: SideMap = None):
         self.tracks: List[Track] = tracks
-        self.current_side = starting_side
-        self.current_track_pos: str = tracks[0].position[1]
-        self.tracks_on_side = self.get_tracks_on_side(starting_side)
-        self.total_len_of_side = self.get_total_len_of_side(starting_side)
+        self.rpm = rpm
+        self.side_map = side_map if side_map is not None else SideMap(tracks)
+        # Sides may be given as printed on the label: 3 means "C". None when
+        # the release has no such side, e.g. a CD
+        self.current_side: Optional[str] = self.side_map.resolve(starting_side)
+        self.sides: Dict[str, SideIndex] = self.map_vinyl(tracks, rpm, self.side_map)
+        self.tracks_on_side = self.get_tracks_on_side(self.current_side)
+        self.total_len_of_side = self.get_total_len_of_side(self.current_side)
+        # Position of the first track on the side ("B1"), None on an empty side
+        self.current_track_pos: Optional[str] = self.tracks_on_side[0].position if self.tracks_on_side else None
+
+    @classmethod
+    def from_release(cls, release, starting_side: Union[int, str], rpm: float = RPM) -> "Vinyl":
+        """A Vinyl sharing the release's cached SideMap."""
+        return cls(release.tracklist, starting_side, rpm, release.side_map)
 
     def set_current_track_pos(self, pos: str):
         self.current_track_pos = pos
 
-    def get_tracks_on_side(self, side: str):
-        return [track for track in self.tracks if track.position[0] == side]
-    
-    def get_total_len_of_side(self, side: str):
-        track_seconds = [Vinyl.duration_to_seconds(track.duration) for track in self.get_tracks_on_side(side)]
-        return sum(track_seconds)
-
-    # @staticmethod
-    # def map_vinyl(tracks: List[Track]):
-    #     vinyl = {}
-    #     for track in tracks:
-    #         if track.position not in vinyl:
-    #             vinyl[track.position] = seconds_to_revolutions(duration_to_seconds(track.duration))
-    #     return vinyl
-    
+    def get_tracks_on_side(self, side: Union[int, str]):
+        index = self.sides.get(self.side_map.resolve(side))
+        return index.tracks if index is not None else []
+
+    def get_total_len_of_side(self, side: Union[int, str]):
+        index = self.sides.get(self.side_map.resolve(side))
+        return index.total_seconds if index is not None else 0
+
+    def locate(self, side: Union[int, str], elapsed: float = None, radius: float = None) -> NeedlePosition:
+        """Track and offset under the needle at `elapsed` seconds or `radius` inches into `side`."""
+        return self.sides[self.side_map.resolve(side)].locate(elapsed=elapsed, radius=radius)
+
+    def seek(self, position: str, offset: float = 0.0) -> NeedlePosition:
+        """Elapsed time and groove radius of `offset` seconds into the track at `position`."""
+        track = self.side_map.track(position)
+        if track is None:
+            raise KeyError(position)
+        return self.sides[track.get_side()].seek(position, offset)
+
+    @staticmethod
+    def map_vinyl(tracks: List[Track], rpm: float = RPM, side_map: SideMap = None) -> Dict[str, SideIndex]:
+        """Builds a SideIndex per side, keeping the tracks in tracklist order."""
+        side_map = side_map if side_map is not None else SideMap(tracks)
+        return {side: SideIndex(side, side_tracks, rpm) for side, side_tracks in side_map.sides.items()}
+
     @staticmethod
     def duration_to_seconds(duration: str):
-        minutes, seconds = duration.split(":")
-        return (int(minutes) * 60) + int(seconds)
+        # Blank or malformed durations count as zero
+        return parse_duration(duration) or 0
 
-    # def seconds_to_revolutions(seconds: int):
-    #     rpm = (100 / 3)
-    #     rps = rpm / 60
-    #     return seconds / rps
\ No newline at end of file
+    @staticmethod
+    def seconds_to_revolutions(seconds: float, rpm: float = RPM):
+        return seconds * rpm / 60
@@ -0,0 +1,94 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket paced against the Discogs per-minute quota.
+
+    The bucket starts full and refills continuously at `requests_per_minute`
+    tokens per `window` seconds, keeping `safety_margin` requests in reserve.
+    Each response's X-Discogs-Ratelimit headers are fed back through update(),
+    so the bucket follows the server's moving window rather than our own guess.
+    Callers reserve a slot before they send; when the bucket is empty,
+    reservations queue up behind each other so concurrent threads are spread
+    evenly across the window instead of bursting into a 429.
+    """
+    LIMIT_HEADER = 'X-Discogs-Ratelimit'
+    REMAINING_HEADER = 'X-Discogs-Ratelimit-Remaining'
+
+    def __init__(self, requests_per_minute=60, safety_margin=2, window=60.0,
+                 backoff_base=1.0, backoff_max=30.0):
+        self.safety_margin = safety_margin
+        self.window = window
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._set_limit(requests_per_minute)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _set_limit(self, limit):
+        self.limit = limit
+        self.capacity = max(1, limit - self.safety_margin)
+        self.rate = self.capacity / self.window
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """Takes one token and returns how many seconds to wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Waits, without blocking the event loop, until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update(self, headers):
+        """Re-syncs the bucket with the quota reported in a response's headers."""
+        if not headers:
+            return
+        limit = _int_header(headers, self.LIMIT_HEADER)
+        remaining = _int_header(headers, self.REMAINING_HEADER)
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit is not None and limit != self.limit:
+                self._set_limit(limit)
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining - self.safety_margin)
+
+    def backoff(self, attempt, retry_after=None):
+        """Seconds to sleep before retry number `attempt` (0-based), with jitter."""
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except (TypeError, ValueError):
+                pass
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+def _int_header(headers, name):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
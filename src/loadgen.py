@@ -0,0 +1,84 @@
+"""
+Load generator comparing the resident service with one-shot script runs.
+
+Sends the given label images round-robin, keeping `--concurrency` requests
+open, and reports throughput, latency percentiles and response statuses.
+
+    python src/loadgen.py src/resources/*.jpg --requests 200 --concurrency 16
+    python src/loadgen.py src/resources/*.jpg --requests 20 --concurrency 4 --script
+"""
+import argparse
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+import numpy as np
+import requests
+
+
+def service_sender(url: str, timeout: float) -> Callable[[str], str]:
+    session = requests.Session()
+    # One pooled connection per concurrent request
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=256))
+
+    def send(path: str) -> str:
+        with open(path, "rb") as f:
+            response = session.post(f"{url}/identify", data=f.read(), timeout=timeout)
+        return str(response.status_code)
+
+    return send
+
+
+def script_sender(script: str, timeout: float) -> Callable[[str], str]:
+    def send(path: str) -> str:
+        result = subprocess.run([sys.executable, script, path], capture_output=True, timeout=timeout)
+        return f"exit {result.returncode}"
+
+    return send
+
+
+def run(send: Callable[[str], str], images: List[str], requests_: int, concurrency: int) -> dict:
+    def timed(i: int) -> Tuple[str, float]:
+        start = time.perf_counter()
+        try:
+            status = send(images[i % len(images)])
+        except Exception as e:
+            status = type(e).__name__
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(requests_)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array([seconds for _, seconds in results])
+    return {
+        "requests": requests_,
+        "seconds": elapsed,
+        "throughput": requests_ / elapsed,
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "p99": float(np.percentile(latencies, 99)),
+        "statuses": dict(Counter(status for status, _ in results)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="+", help="label images to send")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="service address")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--script", action="store_true", help="run src/main.py once per image instead")
+    args = parser.parse_args()
+
+    if args.script:
+        send = script_sender("src/main.py", args.timeout)
+    else:
+        send = service_sender(args.url, args.timeout)
+    report = run(send, args.images, args.requests, args.concurrency)
+    print(f"{report['requests']} requests in {report['seconds']:.1f}s: {report['throughput']:.2f} req/s")
+    print(f"latency p50 {report['p50']:.2f}s  p95 {report['p95']:.2f}s  p99 {report['p99']:.2f}s")
+    print(f"statuses: {report['statuses']}")
@@ -1,70 +1,78 @@
 from PIL import Image
-import tempfile
 from config import Config
-from discogs import Client
-from ocr import Ocr
-from ai import OpenAiVision
+from discogs import Client, LocalIndex, ResponseCache
+from discogs.matcher import Match, best_match
+from discogs.model import BasePaginatedResponse
+from ocr import LabelDetector, Preprocessor
+from ocr.preprocess import ImageSource
+from ai import OllamaText, OpenAiVision
+from ai.cache import AnswerCache
+from pipeline import Answer, Cascade, FuzzyMatchStage, OcrStage, TextModelStage, VisionModelStage
 
 
-def preprocess_image(image: Image) -> Image:
-    image = Ocr.convert_to_grayscale(image)
-    image = Ocr.auto_enhance_contrast(image)
-    image = Ocr.binarize(image)
-    return image
+_preprocessor = Preprocessor(threshold="otsu", max_side=2048, label_detector=LabelDetector())
 
-def save_temp_image(image: Image) -> None:
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as file:
-        file_path = file.name
-    image.save(file_path)
-    return file_path
+
+def preprocess_image(image: ImageSource) -> Image:
+    """Binarizes a label photo; pass a path or bytes so JPEGs decode straight at the working size."""
+    return _preprocessor.run(image)
+
+
+def build_client() -> Client:
+    local_index = LocalIndex(Config.discogs_index_path) if Config.discogs_index_path else None
+    return Client(Config.discogs_pat, cache=ResponseCache(Config.discogs_cache_path), local_index=local_index)
+
+
+def build_cascade(client: Client) -> Cascade:
+    # Cheap stages first; the vision model only sees labels they can't settle
+    answer_cache = AnswerCache(Config.answer_cache_path)
+    stages = [OcrStage()]
+    if client.local_index is not None:
+        stages.append(FuzzyMatchStage(client.local_index, client))
+    stages += [
+        TextModelStage(OllamaText(cache=answer_cache)),
+        VisionModelStage(OpenAiVision(cache=answer_cache), name="openai_vision"),
+    ]
+    return Cascade(stages)
+
+
+def find_release(client: Client, answer: Answer) -> Match:
+    if answer.release is not None:
+        return Match(answer.release, answer.confidence)
+    # Search for album in Discogs and rank the first page of results
+    releases = client.search(answer.album_name, type='release')
+    if len(releases) == 0:
+        raise ValueError(f"no releases found for album name: {answer.album_name}")
+    candidates = releases.page(1) if isinstance(releases, BasePaginatedResponse) else releases
+    return best_match(candidates, answer.album_name, side=answer.side or 1)
 
 
 if __name__ == "__main__":
     import logging
+    import sys
     from config.logging_config import configure_logging
     configure_logging()
     logger = logging.getLogger(__name__)
 
-    TOKEN = Config.discogs_pat
-    client = Client(TOKEN)
-
-    image_path = "src/resources/fleetwood.jpg"
-    image = Image.open(image_path)
-    image = preprocess_image(image)
-    image_path = save_temp_image(image)
-
-    model = OpenAiVision()
-    out = model.get_album_name_and_side(image_path=image_path)
-
-    # model = "vision"
-
-    # # Query model for album name and record side
-    # if model == "text":
-    #     image = Image.open(image_path)
-    #     ocr = Ocr()
-    #     extracted_text = ocr.run(image)
-    #     text_model = Text()
-    #     out = text_model.get_album_name_and_side(extracted_text)
-    # elif model == "vision":
-    #     vision_model = Vision()
-    #     out = vision_model.get_album_name_and_side(image_path=image_path)
-    # else:
-    #     raise NotImplementedError(f"model type {model} is not implemented")
-
-    # Parse results
-    if len(out) < 1 or len(out) > 2:
-        raise ValueError("the model did not return the expected number of results")
-    album_name = out[0]
-    record_side = 1 # if the model can't figure out the record side, we default to 1
-    logger.info(f"Album name: {album_name}")
-    if len(out) == 2:
-        record_side = int(out[1])
-        logger.info(f"Record side: {record_side}")
-
-    # Search for album in Discogs
-    releases = client.search(album_name, type='release')
-    if len(releases) == 0:
-        raise ValueError(f"no releases found for album name: {album_name}")
-    release = releases[0]
+    client = build_client()
+
+    image_path = sys.argv[1] if len(sys.argv) > 1 else "src/resources/fleetwood.jpg"
+    image = preprocess_image(image_path)
+
+    cascade = build_cascade(client)
+    answer, timings = cascade.identify(image)
+    logger.info(f"Stage timings: {timings}")
+    if answer is None:
+        raise ValueError("no stage could read the album name")
+
+    album_name = answer.album_name
+    record_side = answer.side or 1 # if the model can't figure out the record side, we default to 1
+    logger.info(f"Album name: {album_name}, side {record_side} (from {answer.stage}, {answer.confidence:.2f})")
+
+    release, confidence = find_release(client, answer)
+    logger.info(f"Matched {release} with confidence {confidence:.2f}")
 
+    # Labels number their sides, Discogs letters them: side 3 is "C"
+    side = release.side_map.resolve(record_side)
     logger.info(f"Tracklist: {release.tracklist}")
+    logger.info(f"Side {side} (disc {release.side_map.disc_of(side)}): {release.side_map.tracks_on(side)}")
@@ -1 +1,4 @@
-from ocr.ocr import Ocr
\ No newline at end of file
+from ocr.ocr import Ocr, OrientedText
+from ocr.label import LabelDetector
+from ocr.pool import OcrPool, OcrResult
+from ocr.preprocess import Preprocessor
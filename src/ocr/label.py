@@ -0,0 +1,135 @@
+from typing import NamedTuple, Optional
+import numpy as np
+from PIL import Image
+
+
+class Circle(NamedTuple):
+    x: float
+    y: float
+    radius: float
+    # Share of the circumference backed by edge votes, in [0, 1]
+    score: float
+
+
+class LabelDetector:
+    """
+    Finds the center label of a record in a photo so that only the label,
+    rather than grooves and background, goes to OCR or a vision model.
+
+    Detection runs a gradient-directed Hough transform for circles on a copy
+    downsampled to `work_size` pixels. Every strong edge votes for centers
+    lying along its gradient, towards the brighter side, so only bright discs
+    on a darker surround (a paper label on vinyl) collect votes; the record's
+    own rim points the other way and is ignored. Radii are searched between
+    `min_radius` and `max_radius` as fractions of the shorter image side. When
+    no circle reaches `min_score`, e.g. a close-up where the label already fills
+    the frame, detect() returns None and the image is used as-is.
+    """
+
+    def __init__(self, work_size: int = 256, min_radius: float = 0.08, max_radius: float = 0.75,
+                 radius_steps: int = 48, min_score: float = 0.35, margin: float = 0.04,
+                 edge_quantile: float = 0.9):
+        self.work_size = work_size
+        self.min_radius = min_radius
+        self.max_radius = max_radius
+        self.radius_steps = radius_steps
+        self.min_score = min_score
+        self.margin = margin
+        self.edge_quantile = edge_quantile
+
+    def detect(self, image: Image.Image) -> Optional[Circle]:
+        scale = self.work_size / max(image.size)
+        small = image
+        if scale < 1:
+            small = image.resize(
+                (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                Image.Resampling.BILINEAR, reducing_gap=2.0
+            )
+        else:
+            scale = 1.0
+        gray = np.asarray(small.convert("L"), dtype=np.float32)
+        circle = self._hough(gray)
+        if circle is None or circle.score < self.min_score:
+            return None
+        return Circle(circle.x / scale, circle.y / scale, circle.radius / scale, circle.score)
+
+    def _hough(self, gray: np.ndarray) -> Optional[Circle]:
+        h, w = gray.shape
+        gy, gx = np.gradient(gray)
+        magnitude = np.hypot(gx, gy)
+        threshold = np.quantile(magnitude, self.edge_quantile)
+        ys, xs = np.nonzero(magnitude > max(threshold, 1e-3))
+        if len(xs) == 0:
+            return None
+        ux = gx[ys, xs] / magnitude[ys, xs]
+        uy = gy[ys, xs] / magnitude[ys, xs]
+
+        short_side = min(h, w)
+        radii = np.linspace(self.min_radius * short_side, self.max_radius * short_side, self.radius_steps)
+        # Gradients point from dark to bright, i.e. inward for a bright label
+        cx = np.rint(xs[None, :] + radii[:, None] * ux[None, :]).astype(np.int64)
+        cy = np.rint(ys[None, :] + radii[:, None] * uy[None, :]).astype(np.int64)
+        r_index = np.broadcast_to(np.arange(len(radii))[:, None], cx.shape)
+        inside = (cx >= 0) & (cx < w) & (cy >= 0) & (cy < h)
+        votes = np.bincount(
+            (r_index[inside] * h + cy[inside]) * w + cx[inside], minlength=len(radii) * h * w
+        ).reshape(len(radii), h, w).astype(np.float32)
+
+        # Tolerate a pixel of error in the center, then normalize by circumference
+        votes = _box_blur(votes)
+        votes /= (2 * np.pi * radii)[:, None, None]
+        r_best, y_best, x_best = np.unravel_index(np.argmax(votes), votes.shape)
+        score = min(1.0, float(votes[r_best, y_best, x_best]))
+        return Circle(float(x_best), float(y_best), float(radii[r_best]), score)
+
+    def crop(self, image: Image.Image, circle: Circle = None, mask: bool = True) -> Image.Image:
+        """
+        Crops `image` to the detected label (plus `margin`). With `mask`,
+        pixels outside the label circle are filled white. Returns the image
+        unchanged when no label is found.
+        """
+        if circle is None:
+            circle = self.detect(image)
+            if circle is None:
+                return image
+        radius = circle.radius * (1 + self.margin)
+        box = (
+            max(0, int(circle.x - radius)), max(0, int(circle.y - radius)),
+            min(image.width, int(np.ceil(circle.x + radius))), min(image.height, int(np.ceil(circle.y + radius))),
+        )
+        cropped = image.crop(box)
+        if mask:
+            yy, xx = np.ogrid[box[1]:box[3], box[0]:box[2]]
+            outside = (xx - circle.x) ** 2 + (yy - circle.y) ** 2 > radius ** 2
+            pixels = np.array(cropped)
+            pixels[outside] = 255
+            cropped = Image.fromarray(pixels, mode=cropped.mode)
+        return cropped
+
+    def unwrap(self, image: Image.Image, circle: Circle = None, inner: float = 0.15,
+               width: int = None) -> Image.Image:
+        """
+        Polar-unwraps the label into a strip: angle runs along x and radius,
+        from the rim inwards, along y, so text curving around the edge comes
+        out in straight lines. `inner` is the fraction of the radius left out
+        around the spindle hole.
+        """
+        if circle is None:
+            circle = self.detect(image)
+            if circle is None:
+                return image
+        if width is None:
+            width = int(2 * np.pi * circle.radius)
+        height = max(1, int(circle.radius * (1 - inner)))
+        theta = np.linspace(0, 2 * np.pi, width, endpoint=False)[None, :]
+        rho = np.linspace(circle.radius, circle.radius * inner, height)[:, None]
+        xs = np.clip(np.rint(circle.x + rho * np.cos(theta)), 0, image.width - 1).astype(np.intp)
+        ys = np.clip(np.rint(circle.y + rho * np.sin(theta)), 0, image.height - 1).astype(np.intp)
+        return Image.fromarray(np.asarray(image)[ys, xs], mode=image.mode)
+
+
+def _box_blur(volume: np.ndarray) -> np.ndarray:
+    """3x3 box sum over the last two axes of a (R, H, W) volume."""
+    padded = np.pad(volume, ((0, 0), (1, 1), (1, 1)))
+    rows = padded[:, :-2, :] + padded[:, 1:-1, :] + padded[:, 2:, :]
+    return rows[:, :, :-2] + rows[:, :, 1:-1] + rows[:, :, 2:]
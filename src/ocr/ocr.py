@@ -1,8 +1,25 @@
+import threading
+from typing import List, NamedTuple
 import pytesseract
 from PIL import Image, ImageEnhance, ImageOps
+from ocr.label import LabelDetector
+from ocr.orientation import estimate_angles, osd_angle
+from ocr.pool import OcrPool, OcrResult
+
+
+class OrientedText(NamedTuple):
+    text: str
+    # Counter-clockwise rotation applied before OCR, in degrees
+    angle: int
+    # Mean word confidence reported by tesseract, 0-100
+    confidence: float
 
 
 class Ocr:
+    label_detector = LabelDetector()
+    # Shared by every Ocr instance so workers stay warm between batches
+    _pool = None
+    _pool_lock = threading.Lock()
 
     @staticmethod
     def convert_to_grayscale(image: Image) -> Image:
@@ -22,15 +39,86 @@ class Ocr:
         threshold = 128 # 256/2 for binary
         return image.point(lambda x: 0 if x < threshold else 255, '1')
 
+    @classmethod
+    def crop_label(cls, image: Image, unwrap: bool = False) -> Image:
+        # Falls back to the whole image when no center label is found
+        circle = cls.label_detector.detect(image)
+        if circle is None:
+            return image
+        if unwrap:
+            return cls.label_detector.unwrap(image, circle)
+        return cls.label_detector.crop(image, circle)
+
     @staticmethod
     def extract_text(image: Image) -> str:
         # Use Tesseract to do OCR on the image
         return pytesseract.image_to_string(image)
     
-    def run(self, image: Image) -> str:
+    def run(self, image: Image, crop_label: bool = False) -> str:
+        if crop_label:
+            image = self.crop_label(image)
         # Convert to grayscale
         image = self.convert_to_grayscale(image)
         # Enhance contrast
         # self.enhance_contract(image, 2.0)
         # Extract text
         return self.extract_text(image)
+
+    def run_many(self, images: List[Image], crop_label: bool = False) -> List[OcrResult]:
+        """
+        OCRs a batch of images in parallel on a persistent pool of tesseract
+        workers, which also do the label crop and grayscale conversion.
+        Results come back in input order, each with its OCR time.
+        """
+        with Ocr._pool_lock:
+            if Ocr._pool is None:
+                Ocr._pool = OcrPool()
+            pool = Ocr._pool
+        return pool.run_many(images, crop_label)
+
+    @staticmethod
+    def shutdown_pool():
+        with Ocr._pool_lock:
+            pool, Ocr._pool = Ocr._pool, None
+        if pool is not None:
+            pool.close()
+
+    @staticmethod
+    def extract_text_with_confidence(image: Image):
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+        words = [
+            (word, float(conf)) for word, conf in zip(data["text"], data["conf"])
+            if word.strip() and float(conf) >= 0
+        ]
+        if not words:
+            return "", 0.0
+        # Weight by length so stray one-letter hits don't dominate
+        total = sum(len(word) for word, _ in words)
+        confidence = sum(len(word) * conf for word, conf in words) / total
+        return " ".join(word for word, _ in words), confidence
+
+    def run_oriented(self, image: Image, min_confidence: float = 75.0, max_attempts: int = 4,
+                     use_osd: bool = False) -> OrientedText:
+        """
+        OCRs a label photographed at an arbitrary rotation. Candidate angles
+        are ranked cheaply first (projection profile, or tesseract OSD when
+        `use_osd`), then only the best `max_attempts` are OCR'd, stopping as
+        soon as one reads with at least `min_confidence`. Returns the most
+        confident reading.
+        """
+        image = self.convert_to_grayscale(image)
+        angles = estimate_angles(image)
+        if use_osd:
+            angle = osd_angle(image)
+            if angle is not None:
+                angles = [angle] + [a for a in angles if a != angle]
+
+        best = OrientedText("", 0, -1.0)
+        for angle in angles[:max_attempts]:
+            rotated = image.rotate(angle, expand=True, fillcolor=255) if angle else image
+            text, confidence = self.extract_text_with_confidence(rotated)
+            if confidence > best.confidence:
+                best = OrientedText(text, angle, confidence)
+            if confidence >= min_confidence:
+                break
+        return best
@@ -0,0 +1,61 @@
+from typing import List
+import numpy as np
+from PIL import Image
+from ocr.preprocess import Preprocessor
+
+_binarizer = Preprocessor(threshold="otsu", max_side=800)
+
+
+def projection_score(ink: np.ndarray, smoothing: int = 15) -> float:
+    """
+    How sharply the ink falls into horizontal lines: the energy of the row
+    sums once their slow trend (artwork, shadows, the disc's outline) is
+    subtracted. Text peaks when its lines are level and drops quickly as they
+    tilt.
+    """
+    rows = ink.sum(axis=1, dtype=np.int64).astype(np.float64)
+    trend = np.convolve(rows, np.ones(smoothing) / smoothing, mode="same")
+    return float(np.square(rows - trend).sum())
+
+
+def estimate_angles(image: Image.Image, step: int = 5, top_k: int = 2, min_separation: int = 15) -> List[int]:
+    """
+    Ranks likely text rotations (degrees counter-clockwise, as taken by
+    Image.rotate) from a projection profile on a small binarized copy.
+
+    Only the inscribed disc of the image is scored, which suits round labels
+    and means rotating never brings new content into view. A profile can't
+    tell a line from its upside-down twin, so each of the `top_k` best line
+    angles in [0, 180), at least `min_separation` apart, is returned with its
+    180° flip, giving 2 * top_k candidates, best first.
+    """
+    pixels = np.array(_binarizer.run(image).convert("L"))
+    h, w = pixels.shape
+    yy, xx = np.ogrid[:h, :w]
+    pixels[(yy - h / 2) ** 2 + (xx - w / 2) ** 2 > (min(h, w) / 2) ** 2] = 255
+    small = Image.fromarray(pixels)
+
+    scores = []
+    for angle in range(0, 180, step):
+        rotated = small.rotate(angle, resample=Image.Resampling.NEAREST, expand=True, fillcolor=255)
+        scores.append((projection_score(np.asarray(rotated) < 128), angle))
+    scores.sort(reverse=True)
+
+    lines = []
+    for _, angle in scores:
+        if all(min(abs(angle - other), 180 - abs(angle - other)) >= min_separation for other in lines):
+            lines.append(angle)
+            if len(lines) == top_k:
+                break
+    return [candidate for angle in lines for candidate in (angle, angle + 180)]
+
+
+def osd_angle(image: Image.Image):
+    """Tesseract's own orientation estimate (multiples of 90°), or None if it can't tell."""
+    import pytesseract
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+    except pytesseract.TesseractError:
+        return None
+    # OSD reports the clockwise rotation that fixes the page
+    return (360 - int(osd["rotate"])) % 360
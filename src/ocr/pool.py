@@ -0,0 +1,97 @@
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+from PIL import Image
+from ocr.label import LabelDetector
+
+# Per-process tesseract handle and label detector, set once by the pool initializer
+_api = None
+_label_detector = None
+
+
+class OcrResult(NamedTuple):
+    text: str
+    # Wall time spent recognizing this image inside its worker
+    seconds: float
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class OcrPool:
+    """
+    A pool of warm OCR worker processes, one per available core by default.
+
+    Each worker loads tesseract once at startup through tesserocr's in-process
+    API, so no subprocess or temp files are needed per image. tesserocr is
+    required (pip install tesserocr): creating a pool without it raises
+    ImportError. Images travel to the workers as raw pixel buffers rather than
+    encoded files, and the workers do the label crop and grayscale conversion
+    themselves. Tesseract's own threading is capped at one thread per worker so
+    the processes don't oversubscribe the cores between them.
+    """
+
+    def __init__(self, workers: Optional[int] = None, lang: str = "eng"):
+        if importlib.util.find_spec("tesserocr") is None:
+            raise ImportError("OcrPool requires tesserocr; install it with: pip install tesserocr")
+        self.workers = workers or available_cores()
+        self.lang = lang
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker, initargs=(self.lang,)
+                )
+            return self._executor
+
+    def run_many(self, images: List[Image.Image], crop_label: bool = False) -> List[OcrResult]:
+        """
+        OCRs the images in parallel and returns results in input order. With
+        `crop_label`, each worker first crops its image to the record's label.
+        """
+        buffers = [(image.mode, image.size, image.tobytes(), crop_label) for image in images]
+        # Larger chunks amortize IPC for big batches without starving workers
+        chunksize = max(1, len(buffers) // (self.workers * 4))
+        return list(self._get_executor().map(_recognize, buffers, chunksize=chunksize))
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _init_worker(lang: str):
+    global _api, _label_detector
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    import tesserocr
+    _api = tesserocr.PyTessBaseAPI(lang=lang)
+    _label_detector = LabelDetector()
+
+
+def _recognize(buffer) -> OcrResult:
+    mode, size, data, crop_label = buffer
+    image = Image.frombytes(mode, size, data)
+    if crop_label:
+        # Falls back to the whole image when no center label is found
+        image = _label_detector.crop(image)
+    image = image.convert("L")
+    start = time.perf_counter()
+    _api.SetImage(image)
+    return OcrResult(_api.GetUTF8Text(), time.perf_counter() - start)
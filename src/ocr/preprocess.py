@@ -0,0 +1,185 @@
+import io
+import os
+from typing import List, Optional, Union
+import numpy as np
+from PIL import Image
+from ocr.label import LabelDetector
+
+# A photo to preprocess: an image, or a file path or encoded bytes to open
+ImageSource = Union[Image.Image, str, bytes, os.PathLike]
+
+# Fixed-point ITU-R 601-2 luma weights, scaled by 2**16 to match PIL's "L" mode
+_LUMA_LUTS = [
+    (np.arange(256, dtype=np.uint32) * weight).astype(np.uint32)
+    for weight in (19595, 38470, 7471)
+]
+
+
+class Preprocessor:
+    """
+    Fused grayscale -> autocontrast -> threshold pipeline on NumPy arrays.
+
+    The contrast stretch and the threshold are folded into a single 256-entry
+    lookup table that is applied to the image in place, so each image costs
+    one histogram and one table lookup instead of a new PIL image per step.
+    run() works on PIL images; run_array() and run_stack() binarize uint8
+    arrays, or whole (N, H, W) stacks of them, in place.
+    `threshold` is either "otsu" (global, picked from the histogram),
+    "adaptive" (local mean over `block_size` pixels minus `offset`) or a fixed
+    0-255 value. Images larger than `max_side` are downscaled before anything
+    else; JPEGs given as a path or bytes are decoded straight at the reduced
+    size, in grayscale. With a `label_detector`, the downscaled photo is then
+    cropped to the record's center label. run() returns a bilevel ("1")
+    image.
+    """
+
+    def __init__(self, threshold: Union[str, int] = "otsu", max_side: Optional[int] = 2048,
+                 cutoff: float = 0.0, block_size: int = 31, offset: int = 10,
+                 label_detector: Optional[LabelDetector] = None):
+        if not isinstance(threshold, int) and threshold not in ("otsu", "adaptive"):
+            raise ValueError("threshold must be 'otsu', 'adaptive' or an int")
+        self.threshold = threshold
+        self.max_side = max_side
+        self.cutoff = cutoff
+        self.block_size = block_size
+        self.offset = offset
+        self.label_detector = label_detector
+
+    def run(self, image: ImageSource) -> Image.Image:
+        """Binarizes a photo. Pass a path or bytes rather than an opened image for the fast JPEG decode."""
+        image = self.reduce(image)
+        if self.label_detector is not None:
+            image = self.label_detector.crop(image)
+        gray = image if image.mode == "L" else image.convert("L")
+        hist = np.asarray(gray.histogram())
+        contrast = autocontrast_lut(hist, self.cutoff)
+        if self.threshold == "adaptive":
+            array = np.array(gray)
+            np.take(contrast, array, out=array)
+            return Image.fromarray(adaptive_threshold(array, self.block_size, self.offset) > 0)
+        # A single table lookup, done by PIL without another copy through NumPy
+        return gray.point(self._binary_lut(hist, contrast).tolist(), "1")
+
+    def run_many(self, images: List[ImageSource]) -> List[Image.Image]:
+        return [self.run(image) for image in images]
+
+    def reduce(self, image: ImageSource) -> Image.Image:
+        """
+        The image downscaled to fit `max_side`. A path or bytes is opened
+        here, so a JPEG can be decoded straight at the reduced size; an
+        Image passed in is never changed, only resized into a new one.
+        """
+        opened = not isinstance(image, Image.Image)
+        if opened:
+            image = Image.open(io.BytesIO(image) if isinstance(image, bytes) else image)
+        if self.max_side and max(image.size) > self.max_side:
+            scale = self.max_side / max(image.size)
+            size = (round(image.width * scale), round(image.height * scale))
+            if opened:
+                # Lets the JPEG decoder skip straight to a smaller scale, and to grayscale
+                image.draft("L", size)
+            if max(image.size) > self.max_side:
+                image = image.resize(size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return image
+
+    def to_gray(self, image: ImageSource) -> Image.Image:
+        """Returns a downscaled, single-channel copy of the image (see reduce())."""
+        image = self.reduce(image)
+        return image if image.mode == "L" else image.convert("L")
+
+    def to_array(self, image: ImageSource) -> np.ndarray:
+        return np.array(self.to_gray(image))
+
+    def run_array(self, gray: np.ndarray) -> np.ndarray:
+        """Binarizes a 2D uint8 array in place and returns it. RGB arrays are converted first."""
+        if gray.ndim == 3:
+            gray = grayscale(gray)
+        hist = np.bincount(gray.ravel(), minlength=256)
+        contrast = autocontrast_lut(hist, self.cutoff)
+        if self.threshold == "adaptive":
+            np.take(contrast, gray, out=gray)
+            return adaptive_threshold(gray, self.block_size, self.offset)
+        np.take(self._binary_lut(hist, contrast), gray, out=gray)
+        return gray
+
+    def run_stack(self, stack: np.ndarray) -> np.ndarray:
+        """Binarizes a C-contiguous (N, H, W) uint8 stack in place, one table per image."""
+        if not stack.flags.c_contiguous:
+            # reshape() would silently work on a copy and leave the stack untouched
+            raise ValueError("run_stack needs a C-contiguous stack, e.g. np.ascontiguousarray(stack)")
+        n = stack.shape[0]
+        flat = stack.reshape(n, -1)
+        hists = np.bincount(
+            (flat + (np.arange(n, dtype=np.int64)[:, None] << 8)).ravel(), minlength=256 * n
+        ).reshape(n, 256)
+        if self.threshold == "adaptive":
+            for i in range(n):
+                self.run_array(stack[i])
+            return stack
+        luts = np.stack([self._binary_lut(hist, autocontrast_lut(hist, self.cutoff)) for hist in hists])
+        flat[:] = np.take_along_axis(luts, flat, axis=1)
+        return stack
+
+    def _binary_lut(self, hist: np.ndarray, contrast: np.ndarray) -> np.ndarray:
+        if self.threshold == "otsu":
+            # The threshold is chosen on the histogram after the contrast stretch
+            stretched = np.bincount(contrast, weights=hist, minlength=256)
+            threshold = otsu_threshold(stretched)
+        else:
+            threshold = self.threshold
+        return np.where(contrast >= threshold, 255, 0).astype(np.uint8)
+
+
+def grayscale(rgb: np.ndarray) -> np.ndarray:
+    """Converts an (H, W, 3) uint8 array to luma with per-channel lookup tables."""
+    gray = _LUMA_LUTS[0][rgb[..., 0]]
+    gray += _LUMA_LUTS[1][rgb[..., 1]]
+    gray += _LUMA_LUTS[2][rgb[..., 2]]
+    gray += 1 << 15
+    gray >>= 16
+    return gray.astype(np.uint8)
+
+
+def autocontrast_lut(hist: np.ndarray, cutoff: float = 0.0) -> np.ndarray:
+    """A table stretching the histogram's range to 0-255, like ImageOps.autocontrast."""
+    total = hist.sum()
+    cumulative = np.cumsum(hist)
+    clip = total * cutoff / 100
+    lo = int(np.searchsorted(cumulative, clip, side="right"))
+    hi = int(np.searchsorted(cumulative, total - clip, side="left"))
+    levels = np.arange(256, dtype=np.float32)
+    if hi <= lo:
+        return levels.astype(np.uint8)
+    return np.clip((levels - lo) * (255.0 / (hi - lo)), 0, 255).astype(np.uint8)
+
+
+def otsu_threshold(hist: np.ndarray) -> int:
+    """The level maximizing between-class variance of a 256-bin histogram."""
+    hist = hist.astype(np.float64)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    levels = np.arange(256)
+    mass_bg = np.cumsum(hist * levels)
+    mean_bg = np.divide(mass_bg, weight_bg, out=np.zeros(256), where=weight_bg > 0)
+    mean_fg = np.divide(mass_bg[-1] - mass_bg, weight_fg, out=np.zeros(256), where=weight_fg > 0)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    # Pixels above the returned level are foreground
+    return int(np.argmax(between)) + 1
+
+
+def adaptive_threshold(gray: np.ndarray, block_size: int = 31, offset: int = 10) -> np.ndarray:
+    """Binarizes in place against the local mean, computed with an integral image."""
+    h, w = gray.shape
+    r = block_size // 2
+    integral = np.zeros((h + 1, w + 1), dtype=np.int64)
+    np.cumsum(np.cumsum(gray, axis=0), axis=1, out=integral[1:, 1:])
+    y0 = np.clip(np.arange(h) - r, 0, h)[:, None]
+    y1 = np.clip(np.arange(h) + r + 1, 0, h)[:, None]
+    x0 = np.clip(np.arange(w) - r, 0, w)[None, :]
+    x1 = np.clip(np.arange(w) + r + 1, 0, w)[None, :]
+    sums = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+    means = sums // ((y1 - y0) * (x1 - x0))
+    foreground = gray.astype(np.int64) > means - offset
+    gray[:] = 0
+    gray[foreground] = 255
+    return gray
@@ -0,0 +1,5 @@
+from pipeline.cascade import (
+    Answer, Cascade, CascadeResult, CascadeStats, FuzzyMatchStage, OcrStage, Stage, TextModelStage,
+    VisionModelStage
+)
+from pipeline.hedge import HedgedAnswer, Hedger
@@ -0,0 +1,254 @@
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from PIL import Image
+from ai.answer import parse_answer, parse_side
+from discogs.matcher import best_match, similarity
+from ocr import Ocr
+
+logger = logging.getLogger(__name__)
+
+
+class Answer(NamedTuple):
+    album_name: str
+    # 1-based vinyl side, or None when it couldn't be read
+    side: Optional[int]
+    # How much the stage that produced it trusts the answer, in [0, 1]
+    confidence: float
+    stage: str
+    # The matched release, when the stage found one on the way
+    release: object = None
+
+
+class CascadeResult(NamedTuple):
+    answer: Optional[Answer]
+    # Seconds spent in each stage that ran, in order
+    timings: Dict[str, float]
+
+
+_SIDE_PATTERN = re.compile(r"\bside\s*[:.]?\s*([a-z]|\d{1,2})\b", re.IGNORECASE)
+
+
+def side_from_text(text: str) -> Optional[int]:
+    match = _SIDE_PATTERN.search(text or "")
+    return parse_side(match.group(1)) if match else None
+
+
+def text_lines(text: str, min_length: int = 3) -> List[str]:
+    return [line.strip() for line in (text or "").splitlines() if len(line.strip()) >= min_length]
+
+
+class Label:
+    """One label going through the cascade, carrying what earlier stages learned about it."""
+
+    def __init__(self, image: Image.Image):
+        self.image = image
+        self.text: Optional[str] = None
+        # Mean OCR word confidence, 0-100
+        self.ocr_confidence = 0.0
+
+
+class Stage(ABC):
+    """A step of the cascade. Returns an Answer, or None when it has nothing to offer."""
+    name = "stage"
+
+    @abstractmethod
+    def __call__(self, label: Label) -> Optional[Answer]:
+        pass
+
+
+class OcrStage(Stage):
+    """Reads the label text for the stages after it. Never answers on its own."""
+    name = "ocr"
+
+    def __init__(self, ocr: Ocr = None, min_confidence: float = 75.0, max_attempts: int = 4):
+        self.ocr = ocr or Ocr()
+        self.min_confidence = min_confidence
+        self.max_attempts = max_attempts
+
+    def __call__(self, label: Label) -> Optional[Answer]:
+        result = self.ocr.run_oriented(label.image, min_confidence=self.min_confidence,
+                                       max_attempts=self.max_attempts)
+        label.text, label.ocr_confidence = result.text, max(result.confidence, 0.0)
+        return None
+
+
+class FuzzyMatchStage(Stage):
+    """
+    Looks the OCR text up in a LocalIndex and fuzzy-matches each text line
+    against the candidates' titles. The confidence is the best line's match
+    score, so a cleanly printed title that is in the index answers without
+    any model call.
+    """
+    name = "fuzzy"
+
+    def __init__(self, index, client, limit: int = 50, min_ocr_confidence: float = 40.0):
+        self.index = index
+        self.client = client
+        self.limit = limit
+        self.min_ocr_confidence = min_ocr_confidence
+
+    def __call__(self, label: Label) -> Optional[Answer]:
+        lines = text_lines(label.text)
+        if not lines or label.ocr_confidence < self.min_ocr_confidence:
+            return None
+        # OCR text is noisy, so any word may match; best_match scores the candidates below
+        candidates = self.index.search(self.client, " ".join(lines), type="release", limit=self.limit,
+                                       match_all=False)
+        if not candidates:
+            return None
+        side = side_from_text(label.text)
+        best = None
+        for line in lines:
+            match = best_match(candidates, line, side=side)
+            if match is not None and (best is None or match.confidence > best.confidence):
+                best = match
+        title = best.release.data.get("title") or ""
+        return Answer(title.partition(" - ")[2] or title, side, best.confidence, self.name, best.release)
+
+
+class TextModelStage(Stage):
+    """
+    Asks a text model (e.g. OllamaText) to pick the album and side out of the
+    OCR text. Models can make names up, so the confidence is how well the
+    answer is supported by the OCR text itself.
+    """
+    name = "text"
+
+    def __init__(self, model, min_ocr_confidence: float = 40.0):
+        self.model = model
+        self.min_ocr_confidence = min_ocr_confidence
+
+    def __call__(self, label: Label) -> Optional[Answer]:
+        lines = text_lines(label.text)
+        if not lines or label.ocr_confidence < self.min_ocr_confidence:
+            return None
+        parsed = parse_answer(self.model.get_album_name_and_side(label.text))
+        if parsed is None:
+            return None
+        album_name, side = parsed
+        support = float(np.max(similarity(album_name, lines)))
+        return Answer(album_name, side if side is not None else side_from_text(label.text), support, self.name)
+
+
+class VisionModelStage(Stage):
+    """
+    Asks a vision model (OllamaVision, OpenAiVision) about the image itself.
+
+    Vision models report no score, so the confidence starts from
+    `confidence` and is scaled by what can be checked: by
+    `missing_side_factor` when no side was read, and, when OCR found text on
+    the label, by how well the album name is supported by it (halfway to
+    zero for a name that appears nowhere). An unsupported answer then falls
+    below the threshold and escalates to the next stage.
+    """
+
+    def __init__(self, model, name: str = "vision", confidence: float = 0.9, missing_side_factor: float = 0.85):
+        self.model = model
+        self.name = name
+        self.confidence = confidence
+        self.missing_side_factor = missing_side_factor
+
+    def __call__(self, label: Label) -> Optional[Answer]:
+        parsed = parse_answer(self.model.get_album_name_and_side(label.image))
+        if parsed is None:
+            return None
+        album_name, side = parsed
+        confidence = self.confidence
+        if side is None:
+            side = side_from_text(label.text)
+            confidence *= self.missing_side_factor
+        lines = text_lines(label.text)
+        if lines:
+            support = float(np.max(similarity(album_name, lines)))
+            confidence *= 0.5 + 0.5 * support
+        return Answer(album_name, side, confidence, self.name)
+
+
+class CascadeStats:
+    """Thread-safe per-stage timings and escalation counts for a Cascade."""
+
+    def __init__(self):
+        self.labels = 0
+        self.unanswered = 0
+        self._seconds: Dict[str, List[float]] = {}
+        self._accepted: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, accepted: bool):
+        with self._lock:
+            self._seconds.setdefault(stage, []).append(seconds)
+            self._accepted[stage] = self._accepted.get(stage, 0) + accepted
+
+    def finish(self, answered: bool):
+        with self._lock:
+            self.labels += 1
+            self.unanswered += not answered
+
+    def summary(self) -> dict:
+        """
+        Per stage: how often it ran, how often it settled the label, the share
+        of its runs escalated to a later stage, and p50/p95/mean latency.
+        """
+        with self._lock:
+            stages = {}
+            for stage, seconds in self._seconds.items():
+                runs = len(seconds)
+                accepted = self._accepted.get(stage, 0)
+                stages[stage] = {
+                    "runs": runs,
+                    "accepted": accepted,
+                    "escalation_rate": (runs - accepted) / runs,
+                    "mean_seconds": float(np.mean(seconds)),
+                    "p50_seconds": float(np.percentile(seconds, 50)),
+                    "p95_seconds": float(np.percentile(seconds, 95)),
+                }
+            return {"labels": self.labels, "unanswered": self.unanswered, "stages": stages}
+
+    def export(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class Cascade:
+    """
+    Runs stages cheapest first and stops at the first answer whose confidence
+    reaches `threshold`, so clean labels never reach the slow or paid models.
+    When no stage is confident enough, the most confident answer seen is
+    returned.
+
+    The usual order is OcrStage, FuzzyMatchStage and/or TextModelStage, then
+    one or more VisionModelStages.
+    """
+
+    def __init__(self, stages: Sequence[Stage], threshold: float = 0.8, stats: CascadeStats = None):
+        self.stages = list(stages)
+        self.threshold = threshold
+        self.stats = stats or CascadeStats()
+
+    def identify(self, image: Image.Image) -> CascadeResult:
+        label = Label(image)
+        timings = {}
+        best = None
+        for stage in self.stages:
+            start = time.perf_counter()
+            try:
+                answer = stage(label)
+            except Exception:
+                logger.warning(f"cascade stage {stage.name} failed", exc_info=True)
+                answer = None
+            timings[stage.name] = time.perf_counter() - start
+            accepted = answer is not None and answer.confidence >= self.threshold
+            self.stats.record(stage.name, timings[stage.name], accepted)
+            if answer is not None and (best is None or answer.confidence > best.confidence):
+                best = answer
+            if accepted:
+                break
+            logger.debug(f"escalating past {stage.name} ({answer})")
+        self.stats.finish(best is not None)
+        return CascadeResult(best, timings)
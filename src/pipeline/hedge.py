@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+import numpy as np
+from ai.answer import parse_answer
+from ai.stream import StreamCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class HedgedAnswer(NamedTuple):
+    lines: List[str]
+    # Name of the backend whose answer won
+    backend: str
+    seconds: float
+    # How many backends were asked before one answered
+    launched: int
+
+
+class Hedger:
+    """
+    Asks model backends the same question, one after another, without
+    waiting for the slow ones: the next backend is fired once the previous
+    one has been running longer than its usual p95 latency (or immediately
+    if it fails), and the first reply that parse_answer() accepts wins: an
+    album name that isn't a refusal, and a valid side or none at all.
+    Since most replies come back within the p95, backups are rare and the
+    average cost barely moves while the tail latency is cut.
+
+    `backends` are (name, backend) pairs, each with the
+    get_album_name_and_side(input, cancel=None) of the ai backends, all
+    taking the same input (an image for the vision ones, OCR text for
+    OllamaText). Losers are cancelled: queued calls never start and streaming
+    backends abort their stream, while a non-streaming call still in flight
+    runs to completion in the background and its reply is dropped.
+
+    Until a backend has `min_samples` recorded latencies, `delay` seconds is
+    used as its hedge delay. Losing runs are recorded too, and runs cut off
+    by cancellation count the time they ran as a lower bound of their
+    latency; counting winners only would drag the p95, and the delay, ever
+    lower. A failed run counts as no faster than the current hedge delay,
+    so a backend that fails fast doesn't get hedged against sooner.
+
+    A Hedger has the same get_album_name_and_side() as the backends, so it
+    can stand in for one, e.g. in a VisionModelStage.
+    """
+
+    def __init__(self, backends: Sequence[Tuple[str, object]], delay: float = 5.0, percentile: float = 95.0,
+                 min_samples: int = 20, window: int = 200, max_workers: int = 16):
+        if not backends:
+            raise ValueError("at least one backend is needed")
+        self.backends = list(backends)
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.hedges = 0
+        self._latencies: Dict[str, deque] = {name: deque(maxlen=window) for name, _ in self.backends}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+
+    def hedge_delay(self, name: str) -> float:
+        """How long to wait on backend `name` before firing the next one."""
+        with self._lock:
+            samples = list(self._latencies[name])
+        if len(samples) < self.min_samples:
+            return self.delay
+        return float(np.percentile(samples, self.percentile))
+
+    def get_album_name_and_side(self, input, cancel: threading.Event = None) -> List[str]:
+        return self.identify(input, cancel).lines
+
+    def identify(self, input, cancel: threading.Event = None) -> HedgedAnswer:
+        start = time.perf_counter()
+        running = {}
+        launched_at = start
+
+        def launch():
+            nonlocal launched_at
+            name, backend = self.backends[len(running)]
+            event = threading.Event()
+            launched_at = time.perf_counter()
+            future = self._executor.submit(backend.get_album_name_and_side, input, cancel=event)
+            future.add_done_callback(lambda done, name=name, began=launched_at: self._record(name, began, done))
+            running[future] = (name, event)
+            if len(running) > 1:
+                with self._lock:
+                    self.hedges += 1
+                logger.info(f"hedging with {name} after {launched_at - start:.2f}s")
+            return future
+
+        def next_launch():
+            # When the next backup is due, or None if every backend is running
+            if len(running) == len(self.backends):
+                return None
+            return launched_at + self.hedge_delay(self.backends[len(running) - 1][0])
+
+        def cancel_all():
+            for future, (_, event) in running.items():
+                event.set()
+                future.cancel()
+
+        pending = {launch()}
+        try:
+            while pending:
+                if cancel is not None and cancel.is_set():
+                    raise StreamCancelled()
+                due = next_launch()
+                timeout = None if due is None else max(0.0, due - time.perf_counter())
+                if cancel is not None:
+                    # Wake up now and then to notice the caller cancelling
+                    timeout = 0.1 if timeout is None else min(timeout, 0.1)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, _ = running[future]
+                    try:
+                        lines = future.result()
+                    except Exception:
+                        logger.warning(f"backend {name} failed", exc_info=True)
+                        continue
+                    if parse_answer(lines) is not None:
+                        return HedgedAnswer(lines, name, time.perf_counter() - start, len(running))
+                    logger.warning(f"backend {name} returned an unusable answer: {lines}")
+                due = next_launch()
+                if due is not None and (not pending or time.perf_counter() >= due):
+                    pending.add(launch())
+        finally:
+            cancel_all()
+        raise RuntimeError("no backend returned a usable answer")
+
+    def _record(self, name: str, began: float, future):
+        # A future cancelled before it started never ran, so there's nothing to learn from it
+        if future.cancelled():
+            return
+        elapsed = time.perf_counter() - began
+        error = future.exception()
+        if error is not None and not isinstance(error, StreamCancelled):
+            elapsed = max(elapsed, self.hedge_delay(name))
+        with self._lock:
+            self._latencies[name].append(elapsed)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,319 @@
+"""
+Resident identification service.
+
+Keeps the Discogs client, model backends and caches warm between requests
+and serves them over a local HTTP endpoint:
+
+    POST /identify   raw image bytes -> JSON album, side, release and tracklist
+                     (413 without a Content-Length, or over --max-body-bytes)
+    GET  /stats      queue depths, per-stage timings and cascade escalation rates
+
+    python src/service.py --port 8080
+"""
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from discogs import Client
+from main import build_cascade, build_client, find_release, preprocess_image
+from pipeline import Cascade
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """One image travelling through the service's stages."""
+    _ids = itertools.count(1)
+
+    def __init__(self, image_bytes: bytes, on_done: Callable[["Job"], None] = None):
+        self.id = next(self._ids)
+        self.image_bytes = image_bytes
+        self.on_done = on_done
+        self.image = None
+        self.answer = None
+        self.match = None
+        self.side_letter = None
+        self.tracklist = None
+        self.error: Optional[Exception] = None
+        self.timings: Dict[str, float] = {}
+        self.submitted = time.perf_counter()
+        self._done = threading.Event()
+
+    def finish(self, error: Exception = None):
+        self.error = error
+        self.timings["total"] = time.perf_counter() - self.submitted
+        self._done.set()
+        if self.on_done is not None:
+            self.on_done(self)
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        if self.error is not None:
+            return {"id": self.id, "error": str(self.error), "timings": self.timings}
+        release, confidence = self.match
+        return {
+            "id": self.id,
+            "album_name": self.answer.album_name,
+            "side": self.answer.side,
+            "side_letter": self.side_letter,
+            "stage": self.answer.stage,
+            "release_id": release.id,
+            "title": release.data.get("title"),
+            "confidence": confidence,
+            "tracklist": self.tracklist,
+            "timings": self.timings,
+        }
+
+
+class _Stage:
+    """A pool of threads taking jobs from one bounded queue and handing them to the next."""
+
+    def __init__(self, name: str, work: Callable[[Job], None], workers: int, queue_size: int):
+        self.name = name
+        self.work = work
+        self.workers = workers
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.next: Optional["_Stage"] = None
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            start = time.perf_counter()
+            try:
+                self.work(job)
+                error = None
+            except Exception as e:
+                logger.warning(f"job {job.id} failed in {self.name}", exc_info=True)
+                error = e
+            seconds = time.perf_counter() - start
+            job.timings[self.name] = seconds
+            with self._lock:
+                self.busy_seconds += seconds
+                self.completed += error is None
+                self.failed += error is not None
+            if error is not None or self.next is None:
+                job.finish(error)
+            else:
+                # Blocks while the next stage is saturated, which is what
+                # pushes backpressure all the way back to submit()
+                self.next.queue.put(job)
+
+    def stop(self):
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "queued": self.queue.qsize(),
+                "completed": self.completed,
+                "failed": self.failed,
+                "mean_seconds": self.busy_seconds / done if done else 0.0,
+            }
+
+
+class IdentificationService:
+    """
+    Runs preprocess -> identify -> lookup -> tracklist as a pipeline. Each
+    stage has its own thread pool sized for its work (CPU-bound image
+    handling, model calls, Discogs requests) and its own bounded queue, so a
+    slow stage fills its queue, blocks the stage before it and eventually
+    makes submit() refuse new work instead of buffering without limit.
+    """
+
+    def __init__(self, client: Client, cascade: Cascade, queue_size: int = 16, preprocess_workers: int = 2,
+                 identify_workers: int = 8, lookup_workers: int = 4, tracklist_workers: int = 4):
+        self.client = client
+        self.cascade = cascade
+        self.stages = [
+            _Stage("preprocess", self._preprocess, preprocess_workers, queue_size),
+            _Stage("identify", self._identify, identify_workers, queue_size),
+            _Stage("lookup", self._lookup, lookup_workers, queue_size),
+            _Stage("tracklist", self._tracklist, tracklist_workers, queue_size),
+        ]
+        for stage, following in zip(self.stages, self.stages[1:]):
+            stage.next = following
+        self.rejected = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+
+    def submit(self, image_bytes: bytes, block: bool = False, timeout: float = None,
+               on_done: Callable[[Job], None] = None) -> Job:
+        """
+        Queues an image. Raises queue.Full when the service is saturated.
+        `on_done` is called with the job, from a worker thread, once it
+        finishes.
+        """
+        job = Job(image_bytes, on_done)
+        try:
+            self.stages[0].queue.put(job, block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise
+        return job
+
+    def _preprocess(self, job: Job):
+        job.image = preprocess_image(job.image_bytes)
+
+    def _identify(self, job: Job):
+        job.answer, cascade_timings = self.cascade.identify(job.image)
+        job.timings.update({f"cascade.{name}": seconds for name, seconds in cascade_timings.items()})
+        if job.answer is None:
+            raise ValueError("no stage could read the album name")
+
+    def _lookup(self, job: Job):
+        job.match = find_release(self.client, job.answer)
+
+    def _tracklist(self, job: Job):
+        job.side_letter = job.match.release.side_map.resolve(job.answer.side)
+        job.tracklist = [
+            {"position": track.position, "title": track.title, "duration": track.duration}
+            for track in job.match.release.tracklist
+        ]
+
+    def stats(self) -> dict:
+        completed = self.stages[-1].completed
+        return {
+            "uptime_seconds": time.perf_counter() - self.started,
+            "completed": completed,
+            "failed": sum(stage.failed for stage in self.stages),
+            "rejected": self.rejected,
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+            "cascade": self.cascade.stats.summary(),
+        }
+
+
+def make_handler(service: IdentificationService, job_timeout: float, max_body_bytes: int = 20 * 1024 * 1024):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self._send(404, {"error": "not found"})
+                return
+            self._send(200, service.stats())
+
+        def do_POST(self):
+            if self.path != "/identify":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers["Content-Length"])
+            except (KeyError, TypeError, ValueError):
+                length = -1
+            if length < 0 or length > max_body_bytes:
+                # Refused before reading, so an oversized body is never buffered
+                self.close_connection = True
+                self._send(413, {"error": f"Content-Length must be given and at most {max_body_bytes} bytes"})
+                return
+            image_bytes = self.rfile.read(length)
+            if not image_bytes:
+                self._send(400, {"error": "empty request body"})
+                return
+            try:
+                job = service.submit(image_bytes)
+            except queue.Full:
+                self._send(503, {"error": "queue full"}, {"Retry-After": "1"})
+                return
+            if not job.wait(job_timeout):
+                self._send(504, {"id": job.id, "error": "timed out"})
+                return
+            self._send(200 if job.error is None else 422, job.to_dict())
+
+        def _send(self, status: int, body: dict, headers: dict = None):
+            data = json.dumps(body, default=str).encode("utf8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return Handler
+
+
+def warm_up(cascade: Cascade):
+    """Loads local models ahead of the first request."""
+    for stage in cascade.stages:
+        model = getattr(stage, "model", None)
+        if hasattr(model, "warm"):
+            try:
+                model.warm()
+            except Exception:
+                logger.warning(f"could not warm {stage.name}", exc_info=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    from config.logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--queue-size", type=int, default=16, help="jobs buffered in front of each stage")
+    parser.add_argument("--preprocess-workers", type=int, default=2)
+    parser.add_argument("--identify-workers", type=int, default=8)
+    parser.add_argument("--lookup-workers", type=int, default=4)
+    parser.add_argument("--tracklist-workers", type=int, default=4)
+    parser.add_argument("--job-timeout", type=float, default=120.0, help="seconds a request waits for its result")
+    parser.add_argument("--max-body-bytes", type=int, default=20 * 1024 * 1024, help="largest image accepted")
+    args = parser.parse_args()
+
+    configure_logging()
+    client = build_client()
+    cascade = build_cascade(client)
+    warm_up(cascade)
+    service = IdentificationService(
+        client, cascade, queue_size=args.queue_size, preprocess_workers=args.preprocess_workers,
+        identify_workers=args.identify_workers, lookup_workers=args.lookup_workers,
+        tracklist_workers=args.tracklist_workers,
+    )
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.job_timeout, args.max_body_bytes))
+    logger.info(f"listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        client.close()